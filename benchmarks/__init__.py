@@ -0,0 +1,3 @@
+"""
+Benchmark harness that drives PokeFacade against a local PokeAPI stand-in.
+"""
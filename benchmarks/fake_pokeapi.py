@@ -0,0 +1,192 @@
+"""
+This module contains FakePokeApi class, a local aiohttp stand-in for the pokemon, move, ability and stat endpoints.
+"""
+import asyncio
+import email.utils
+import hashlib
+import json
+import random
+import time
+from aiohttp import web
+from pokeretriever.pokemon_requests import API_ROOT
+from pokeretriever.pokemon_snapshot import SnapshotStore
+
+STAT_NAMES = ('hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed')
+TYPE_NAMES = ('normal', 'fire', 'water', 'electric', 'grass', 'ice', 'fighting', 'poison', 'ground', 'flying',
+              'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy')
+
+
+class FakePokeApi:
+    """
+    FakePokeApi represents a local PokeAPI stand-in serving either recorded fixtures from a SnapshotStore or a
+    synthetic dataset shaped like PokeAPI. Every response waits latency seconds (plus up to jitter seconds) and
+    fails with a 503 with probability error_rate. Resources carry an ETag and a Last-Modified header and conditional
+    requests are answered with 304 Not Modified. Request counts per resource type, and of 304 responses under
+    not_modified, are kept for the benchmarks.
+    """
+
+    def __init__(self, latency=0.02, jitter=0.01, error_rate=0.0, fixtures=None,
+                 num_pokemon=1000, num_moves=400, num_abilities=150, moves_per_pokemon=80, padding=200):
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._resources = {}
+        self._names = {}
+        self._last_modified = email.utils.formatdate(time.time(), usegmt=True)
+        self.request_counts = {}
+        if fixtures:
+            self._load_fixtures(fixtures)
+        else:
+            self._generate(num_pokemon, num_moves, num_abilities, moves_per_pokemon, padding)
+
+    def _add(self, kind, resource):
+        body = json.dumps(resource).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self._resources.setdefault(kind, {})[resource['id']] = (resource['name'], body, etag)
+        self._names.setdefault(kind, {})[resource['name']] = resource['id']
+
+    def _load_fixtures(self, path):
+        """
+        Loads every resource of a SnapshotStore as the recorded fixtures.
+
+        :param path: String, snapshot filepath
+        :return: None
+        """
+        store = SnapshotStore(path)
+        try:
+            for kind in ('pokemon', 'move', 'ability', 'stat'):
+                for resource in store.iter_kind(kind):
+                    self._add(kind, resource)
+        finally:
+            store.close()
+
+    def _generate(self, num_pokemon, num_moves, num_abilities, moves_per_pokemon, padding):
+        """
+        Generates a synthetic dataset. padding is the number of version group details per move of a Pokemon,
+        which is what makes real Pokemon payloads large.
+
+        :return: None
+        """
+        rng = random.Random(0)
+        for stat_id, name in enumerate(STAT_NAMES, start=1):
+            self._add('stat', {'id': stat_id, 'name': name, 'is_battle_only': False})
+        for move_id in range(1, num_moves + 1):
+            self._add('move', {'id': move_id, 'name': f'move-{move_id}',
+                               'generation': {'name': 'generation-i', 'url': f'{API_ROOT}/generation/1/'},
+                               'accuracy': 100, 'pp': 35, 'power': rng.choice([None, 40, 60, 80, 90, 120]),
+                               'type': {'name': rng.choice(TYPE_NAMES), 'url': f'{API_ROOT}/type/1/'},
+                               'damage_class': {'name': 'physical', 'url': f'{API_ROOT}/move-damage-class/2/'},
+                               'effect_entries': [{'short_effect': 'Inflicts regular damage.',
+                                                   'effect': 'Inflicts regular damage.'}]})
+        for pokemon_id in range(1, num_pokemon + 1):
+            details = [{'level_learned_at': level, 'move_learn_method': {'name': 'level-up', 'url': ''},
+                        'version_group': {'name': f'version-{level}', 'url': ''}} for level in range(padding)]
+            ability_ids = rng.sample(range(1, num_abilities + 1), 2)
+            self._add('pokemon', {'id': pokemon_id, 'name': f'pokemon-{pokemon_id}', 'height': rng.randint(1, 50),
+                                  'weight': rng.randint(1, 2000),
+                                  'stats': [{'base_stat': rng.randint(5, 200), 'effort': 0,
+                                             'stat': {'name': name, 'url': f'{API_ROOT}/stat/{stat_id}/'}}
+                                            for stat_id, name in enumerate(STAT_NAMES, start=1)],
+                                  'types': [{'slot': 1, 'type': {'name': rng.choice(TYPE_NAMES), 'url': ''}}],
+                                  'abilities': [{'ability': {'name': f'ability-{ability_id}',
+                                                             'url': f'{API_ROOT}/ability/{ability_id}/'},
+                                                 'is_hidden': False, 'slot': 1} for ability_id in ability_ids],
+                                  'moves': [{'move': {'name': f'move-{move_id}', 'url': f'{API_ROOT}/move/{move_id}/'},
+                                             'version_group_details': details}
+                                            for move_id in rng.sample(range(1, num_moves + 1),
+                                                                      min(moves_per_pokemon, num_moves))]})
+        holders = {}
+        for pokemon_id, (name, body, _) in self._resources['pokemon'].items():
+            for ability in json.loads(body)['abilities']:
+                holders.setdefault(ability['ability']['name'], []).append(name)
+        for ability_id in range(1, num_abilities + 1):
+            name = f'ability-{ability_id}'
+            self._add('ability', {'id': ability_id, 'name': name,
+                                  'generation': {'name': 'generation-iii', 'url': ''},
+                                  'effect_entries': [{'effect': 'Wirkung', 'short_effect': 'Wirkung'},
+                                                     {'effect': 'Does something.', 'short_effect': 'Something.'}],
+                                  'pokemon': [{'pokemon': {'name': holder, 'url': ''}, 'is_hidden': False}
+                                              for holder in holders.get(name, [])]})
+
+    def names(self, kind):
+        """
+        Gets every name of a resource type, in id order.
+
+        :param kind: String
+        :return: list of strings
+        """
+        return [name for _, (name, _, _) in sorted(self._resources.get(kind, {}).items())]
+
+    async def _handle_list(self, request):
+        kind = request.match_info['kind']
+        limit = int(request.query.get('limit', 20))
+        offset = int(request.query.get('offset', 0))
+        ids = sorted(self._resources.get(kind, {}))
+        page = ids[offset:offset + limit]
+        next_url = f"{API_ROOT}/{kind}?limit={limit}&offset={offset + limit}" if offset + limit < len(ids) else None
+        return web.json_response({'count': len(ids), 'next': next_url, 'previous': None,
+                                  'results': [{'name': self._resources[kind][resource_id][0],
+                                               'url': f"{API_ROOT}/{kind}/{resource_id}/"} for resource_id in page]})
+
+    async def _handle_resource(self, request):
+        kind = request.match_info['kind']
+        key = request.match_info['key'].lower()
+        resources = self._resources.get(kind, {})
+        resource_id = int(key) if key.isdigit() else self._names.get(kind, {}).get(key)
+        if resource_id not in resources:
+            return web.Response(status=404, text='Not Found')
+        _, body, etag = resources[resource_id]
+        headers = {'ETag': etag, 'Last-Modified': self._last_modified}
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match == etag or (if_none_match is None and
+                                     request.headers.get('If-Modified-Since') == self._last_modified):
+            self.request_counts['not_modified'] = self.request_counts.get('not_modified', 0) + 1
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        if request.path.startswith('/__'):
+            return await handler(request)
+        kind = request.match_info.get('kind', '')
+        self.request_counts[kind] = self.request_counts.get(kind, 0) + 1
+        await asyncio.sleep(self._latency + random.uniform(0, self._jitter))
+        if self._error_rate and random.random() < self._error_rate:
+            return web.Response(status=503, text='Service Unavailable')
+        return await handler(request)
+
+    async def _handle_stats(self, request):
+        return web.json_response(self.request_counts)
+
+    async def _handle_reset(self, request):
+        self.request_counts = {}
+        return web.json_response({})
+
+    def make_app(self):
+        """
+        Makes the aiohttp application serving the fake API under /api/v2.
+
+        :return: aiohttp.web.Application
+        """
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/__stats', self._handle_stats)
+        app.router.add_post('/__reset', self._handle_reset)
+        for suffix in ('', '/'):
+            app.router.add_get('/api/v2/{kind}' + suffix, self._handle_list)
+            app.router.add_get('/api/v2/{kind}/{key}' + suffix, self._handle_resource)
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Starts serving and returns the base url to point PokemonSession at.
+
+        :param host: String
+        :param port: Integer, 0 to pick a free port
+        :return: tuple (web.AppRunner, base url:str)
+        """
+        runner = web.AppRunner(self.make_app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return runner, f"http://{host}:{bound_port}/api/v2"
@@ -0,0 +1,213 @@
+"""
+Runs the benchmark scenarios against a local FakePokeApi and reports throughput, latency, peak RSS and request counts.
+
+Usage: python -m benchmarks.run_benchmarks [--scenario NAME ...] [--json results.json] [--baseline results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+
+from benchmarks.fake_pokeapi import FakePokeApi
+from pokeretriever.pokemon_facade import PokeFacade
+from pokeretriever.pokemon_requests import Request, SessionConfig, CacheConfig, SchedulerConfig, OutputConfig
+from pokeretriever.pokemon_session import PokemonSession
+from pokeretriever.pokemon_writer import OutputWriter
+
+
+@dataclass
+class Scenario:
+    name: str
+    num_inputs: int
+    expanded: bool = False
+    cache: bool = False
+    warm: bool = False
+    mode: str = 'pokemon'
+
+
+SCENARIOS = {
+    'single': Scenario('single', 1),
+    'batch-1k': Scenario('batch-1k', 1000),
+    'expanded': Scenario('expanded', 100, expanded=True),
+    'cold-cache': Scenario('cold-cache', 200, expanded=True, cache=True),
+    'warm-cache': Scenario('warm-cache', 200, expanded=True, cache=True, warm=True),
+}
+
+
+def peak_rss_mb():
+    """
+    Gets the peak resident set size of this process. VmHWM is preferred because, unlike ru_maxrss, it is not
+    inherited from the parent across exec.
+
+    :return: Float, megabytes
+    """
+    try:
+        with open('/proc/self/status', encoding='utf-8') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_worker(scenario: Scenario, base_url, names, cache_dir, concurrency):
+    """
+    Runs one scenario through PokeFacade in this process and measures it.
+
+    :return: dict of measurements
+    """
+    dispatched = {}
+
+    def timed_inputs():
+        for index, name in enumerate(names):
+            dispatched[index] = time.perf_counter()
+            yield name
+
+    request = Request(scenario.mode, None, None, scenario.expanded, os.devnull)
+    latencies = []
+    started = time.perf_counter()
+    async with PokemonSession(SessionConfig(base_url=base_url),
+                              CacheConfig(cache_dir=cache_dir, enabled=scenario.cache),
+                              SchedulerConfig(concurrency=concurrency, rate=0)) as session:
+        results = PokeFacade.execute_inputs(request, timed_inputs(), session, concurrency * 2)
+        with OutputWriter(os.devnull, len(names), OutputConfig(), scenario.mode) as writer:
+            async for index, pokedex_object in results:
+                latencies.append(time.perf_counter() - dispatched.pop(index))
+                writer.write(index, pokedex_object)
+    elapsed = time.perf_counter() - started
+    return {'items': len(names), 'seconds': elapsed, 'throughput': len(names) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 0.5) * 1000, 'p99_ms': percentile(latencies, 0.99) * 1000,
+            'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+            'peak_rss_mb': peak_rss_mb()}
+
+
+async def run_scenario(scenario: Scenario, base_url, fake: FakePokeApi, cache_dir, concurrency):
+    """
+    Runs one scenario in a fresh child process so its peak RSS is its own, priming the cache first if it is warm.
+
+    :return: dict of measurements
+    """
+    names = fake.names(scenario.mode)
+    names = [names[index % len(names)] for index in range(scenario.num_inputs)]
+    if scenario.warm:
+        await _spawn(scenario, base_url, names, cache_dir, concurrency)
+    fake.request_counts = {}
+    result = await _spawn(scenario, base_url, names, cache_dir, concurrency)
+    result['requests'] = sum(fake.request_counts.values())
+    result['requests_by_kind'] = dict(fake.request_counts)
+    return result
+
+
+async def _spawn(scenario: Scenario, base_url, names, cache_dir, concurrency):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as spec:
+        json.dump({'scenario': asdict(scenario), 'base_url': base_url, 'names': names,
+                   'cache_dir': cache_dir, 'concurrency': concurrency}, spec)
+    try:
+        process = await asyncio.create_subprocess_exec(sys.executable, '-m', 'benchmarks.run_benchmarks',
+                                                       '--worker', spec.name, stdout=asyncio.subprocess.PIPE)
+        stdout, _ = await process.communicate()
+    finally:
+        os.unlink(spec.name)
+    if process.returncode != 0:
+        raise RuntimeError(f"Scenario {scenario.name} failed with exit code {process.returncode}")
+    return json.loads(stdout.decode('utf-8').strip().splitlines()[-1])
+
+
+def print_report(results):
+    header = f"{'scenario':<12}{'items':>7}{'items/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'RSS MB':>9}{'requests':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        print(f"{name:<12}{result['items']:>7}{result['throughput']:>10.1f}{result['p50_ms']:>9.1f}"
+              f"{result['p99_ms']:>9.1f}{result['peak_rss_mb']:>9.1f}{result['requests']:>10}")
+
+
+def compare_to_baseline(results, baseline_path, tolerance):
+    """
+    Compares throughput and request counts against a previous run.
+
+    :return: list of strings, one per regression
+    """
+    with open(baseline_path, encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result['throughput'] < previous['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']:.1f}/s, was {previous['throughput']:.1f}/s")
+        if result['requests'] > previous['requests']:
+            regressions.append(f"{name}: {result['requests']} requests, was {previous['requests']}")
+    return regressions
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="Scenario to run, may be repeated. Runs every scenario by default.")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds the fake API waits per response.")
+    parser.add_argument('--jitter', type=float, default=0.01, help="Extra random seconds per response.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of responses failing with 503.")
+    parser.add_argument('--fixtures', help="Snapshot file of recorded responses to serve instead of synthetic ones.")
+    parser.add_argument('--padding', type=int, default=200,
+                        help="Version group details per move of synthetic Pokemon, drives the payload size.")
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--json', help="Write the results to this file.")
+    parser.add_argument('--baseline', help="Fail if throughput or request counts regressed against this file.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed throughput drop against the baseline.")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+async def main():
+    arguments = _parse_arguments()
+    if arguments.worker:
+        with open(arguments.worker, encoding='utf-8') as file:
+            spec = json.load(file)
+        result = await run_worker(Scenario(**spec['scenario']), spec['base_url'], spec['names'],
+                                  spec['cache_dir'], spec['concurrency'])
+        print(json.dumps(result))
+        return 0
+
+    fake = FakePokeApi(arguments.latency, arguments.jitter, arguments.error_rate, arguments.fixtures,
+                       padding=arguments.padding)
+    runner, base_url = await fake.start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as cold_dir, tempfile.TemporaryDirectory() as warm_dir:
+            for name in arguments.scenario or SCENARIOS:
+                scenario = SCENARIOS[name]
+                cache_dir = warm_dir if scenario.warm else cold_dir
+                results[name] = await run_scenario(scenario, base_url, fake, cache_dir, arguments.concurrency)
+    finally:
+        await runner.cleanup()
+
+    print_report(results)
+    if arguments.json:
+        with open(arguments.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+    if arguments.baseline:
+        regressions = compare_to_baseline(results, arguments.baseline, arguments.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
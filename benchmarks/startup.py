@@ -0,0 +1,151 @@
+"""
+Measures the startup cost of short driver.py invocations with python -X importtime: wall time, total import time and
+whether aiohttp was imported, for --help, an invalid mode, a response cache hit and an offline snapshot lookup.
+
+Usage: python -m benchmarks.startup [--runs N] [--json results.json] [--baseline results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+from benchmarks.fake_pokeapi import FakePokeApi
+
+DRIVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'driver.py')
+
+
+@dataclass
+class StartupScenario:
+    name: str
+    arguments: tuple
+    loads_aiohttp: bool = False
+
+
+def make_scenarios(base_url, cache_dir, snapshot_path):
+    common = ('--no-daemon', '--base-url', base_url, '--cache-dir', cache_dir)
+    return {
+        'help': StartupScenario('help', ('--help',)),
+        'invalid-mode': StartupScenario('invalid-mode', ('bogus', '--inputdata', '1')),
+        'cache-hit': StartupScenario('cache-hit', ('pokemon', '--inputdata', 'pokemon-1', *common)),
+        'offline': StartupScenario('offline', ('pokemon', '--inputdata', 'pokemon-2', '--offline', '--snapshot',
+                                               snapshot_path, '--no-daemon')),
+    }
+
+
+def parse_importtime(stderr):
+    """
+    Parses the output of -X importtime.
+
+    :param stderr: String
+    :return: tuple (total import time in milliseconds, set of imported module names)
+    """
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        modules.add(name.strip())
+    return total_us / 1000, modules
+
+
+async def run_driver(arguments, importtime=False):
+    options = ('-X', 'importtime') if importtime else ()
+    process = await asyncio.create_subprocess_exec(sys.executable, *options, DRIVER, *arguments,
+                                                   stdout=asyncio.subprocess.DEVNULL,
+                                                   stderr=asyncio.subprocess.PIPE)
+    _, stderr = await process.communicate()
+    return stderr.decode('utf-8')
+
+
+async def measure(scenario: StartupScenario, runs):
+    """
+    Runs a scenario runs times for its wall time and once more under -X importtime.
+
+    :return: dict of measurements
+    """
+    wall_times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await run_driver(scenario.arguments)
+        wall_times.append(time.perf_counter() - started)
+    import_ms, modules = parse_importtime(await run_driver(scenario.arguments, importtime=True))
+    return {'wall_ms': statistics.median(wall_times) * 1000, 'import_ms': import_ms, 'modules': len(modules),
+            'aiohttp': 'aiohttp' in modules, 'expected_aiohttp': scenario.loads_aiohttp}
+
+
+def print_report(results):
+    header = f"{'scenario':<14}{'wall ms':>9}{'import ms':>11}{'modules':>9}{'aiohttp':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        print(f"{name:<14}{result['wall_ms']:>9.1f}{result['import_ms']:>11.1f}{result['modules']:>9}"
+              f"{'yes' if result['aiohttp'] else 'no':>9}")
+
+
+def compare_to_baseline(results, baseline_path, tolerance):
+    """
+    Compares import times against a previous run and checks aiohttp stays out of the scenarios that don't need it.
+
+    :return: list of strings, one per regression
+    """
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as file:
+            baseline = json.load(file)
+    regressions = []
+    for name, result in results.items():
+        if result['aiohttp'] and not result['expected_aiohttp']:
+            regressions.append(f"{name}: imports aiohttp")
+        previous = baseline.get(name)
+        if previous is not None and result['import_ms'] > previous['import_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: imports take {result['import_ms']:.1f} ms, was {previous['import_ms']:.1f} ms")
+    return regressions
+
+
+def _parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="Runs per scenario the median wall time is taken of.")
+    parser.add_argument('--json', help="Write the results to this file.")
+    parser.add_argument('--baseline', help="Fail if import times regressed against this file.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed import time increase over the baseline.")
+    return parser.parse_args()
+
+
+async def main():
+    arguments = _parse_arguments()
+    fake = FakePokeApi(latency=0, jitter=0, num_pokemon=20, num_moves=40, num_abilities=10, moves_per_pokemon=10,
+                       padding=5)
+    runner, base_url = await fake.start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            cache_dir = os.path.join(work_dir, 'cache')
+            snapshot_path = os.path.join(work_dir, 'snapshot.sqlite3')
+            scenarios = make_scenarios(base_url, cache_dir, snapshot_path)
+            await run_driver(scenarios['cache-hit'].arguments)
+            await run_driver(('snapshot', '--no-daemon', '--no-cache', '--base-url', base_url, '--snapshot',
+                              snapshot_path, '--rate', '0'))
+            for name, scenario in scenarios.items():
+                results[name] = await measure(scenario, arguments.runs)
+    finally:
+        await runner.cleanup()
+
+    print_report(results)
+    if arguments.json:
+        with open(arguments.json, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+    regressions = compare_to_baseline(results, arguments.baseline, arguments.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -2,43 +2,191 @@
 # Student number: A01240893, A01229209
 from pokeretriever import cli_parser
 from pokeretriever.cli_parser import InvalidModeException
-from pokefacade import PokeFacade
 import platform
-from pokeretriever.pokemon_parser import PokemonParser
-from pokeretriever.pokemon_requests import Request
-import asyncio
+from pokeretriever.pokemon_requests import Request, SessionConfig, CacheConfig, SchedulerConfig
 
 
-def print_all(pokemon_data):
-    for pokemon in pokemon_data:
-        print(pokemon)
+async def take_snapshot(session, snapshot_path):
+    from pokeretriever.pokemon_pkdx import PkdxStore, is_pkdx
+    from pokeretriever.pokemon_snapshot import SnapshotStore, crawl_snapshot
+    store = SnapshotStore(":memory:" if is_pkdx(snapshot_path) else snapshot_path)
+    try:
+        counts = await crawl_snapshot(session, store)
+        if is_pkdx(snapshot_path):
+            PkdxStore.write(store, snapshot_path, counts)
+    finally:
+        store.close()
+    for kind, count in counts.items():
+        print(f"Stored {count} {kind} resources in {snapshot_path}")
+
+
+def open_journal(output, output_config):
+    from pokeretriever.pokemon_journal import Journal
+    if not output or not (output_config.journal or output_config.resume):
+        return None
+    journal = Journal(output, output_config.resume)
+    if journal.completed:
+        print(f"Resuming, {len(journal.completed)} requests already done")
+    return journal
+
+
+def can_forward(session_config, cache_config, scheduler_config):
+    """
+    Checks the run only uses the default session, cache and scheduler settings. The daemon looks up with its own,
+    so a run asking for others, such as --offline or another --cache-dir, is answered in-process instead.
+    """
+    return session_config == SessionConfig() and cache_config == CacheConfig() and \
+        scheduler_config == SchedulerConfig()
+
+
+def forward_to_daemon(client, request, output_config, stats):
+    from pokeretriever.pokemon_facade import PokeFacade
+    from pokeretriever.pokemon_writer import OutputWriter
+    inputs, length = PokeFacade.read_inputs(request)
+    journal = open_journal(request.output, output_config)
+    completed = journal.completed.copy() if journal else frozenset()
+    with OutputWriter(request.output, length, output_config, request.search_mode, stats, request.fields,
+                      journal) as writer:
+        with stats.timer("daemon"):
+            for index, rendered_result in client.lookup_many(request.search_mode, inputs, request.is_expanded,
+                                                             completed, request.fields, request.plan,
+                                                             request.use_index):
+                writer.write(index, rendered_result)
+    stats.report()
 
 
-def write_all(output_name, pokemon_data):
-    requests_len = len(pokemon_data)
-    for pokemon in pokemon_data:
-        PokemonParser.write_pokedex_object_to_output_file(requests_len, pokemon, output_name)
+async def write_results(results, length, request, output_config, stats, journal):
+    from pokeretriever.pokemon_writer import OutputWriter
+    with OutputWriter(request.output, length, output_config, request.search_mode, stats, request.fields,
+                      journal) as writer:
+        async for index, pokedex_object in results:
+            writer.write(index, pokedex_object)
 
 
-async def main():
+async def answer_query(session, request, query_config, cache_config, snapshot_path, output_config, stats):
+    from pokeretriever.pokemon_relations import load_relation_index
+    from pokeretriever.pokemon_writer import OutputWriter
+    relation_index = await load_relation_index(session, query_config, cache_config, snapshot_path)
+    with stats.timer("query"):
+        matches = relation_index.query(query_config.learns, query_config.types, query_config.abilities,
+                                       query_config.max_level)
+    if not matches:
+        print("No Pokemon match the query")
+    with OutputWriter(request.output, len(matches), output_config, request.search_mode, stats) as writer:
+        for index, match in enumerate(matches):
+            writer.write(index, match)
+
+
+async def report_analytics(session, request, analytics_config, snapshot_path, output_config, stats):
+    from pokeretriever.pokemon_analytics import load_column_table
+    from pokeretriever.pokemon_writer import OutputWriter
+    table = await load_column_table(session, analytics_config.table, snapshot_path)
+    with stats.timer("analytics"):
+        rows = table.report(analytics_config)
+    if not rows:
+        print(f"No {analytics_config.table} matches the filters")
+    with OutputWriter(request.output, len(rows), output_config, request.search_mode, stats) as writer:
+        for index, row in enumerate(rows):
+            writer.write(index, row)
+
+
+async def main(request):
+    from pokeretriever.pokemon_facade import PokeFacade
+    from pokeretriever.pokemon_client import PokedexClient
+    from pokeretriever.pokemon_daemon import PokedexDaemon, DaemonClient, DaemonRunningError
+    from pokeretriever.pokemon_index import InvalidQueryException
+    from pokeretriever.pokemon_session import OfflineLookupError
+    from pokeretriever.pokemon_stats import RunStats, NullStats
     try:
-        arguments = cli_parser.parse_request_requirements()
-        output = arguments[-1]
-        request = Request(*arguments)
+        output = request.output
+
+        session_config = cli_parser.parse_session_requirements()
+        scheduler_config = cli_parser.parse_scheduler_requirements()
+        stats_config = cli_parser.parse_stats_requirements()
+        stats = RunStats(stats_config.trace_path) if stats_config.enabled else NullStats()
+
+        daemon_config = cli_parser.parse_daemon_requirements()
+        output_config = cli_parser.parse_output_requirements()
 
-        request_tasks, length = PokeFacade.execute_request(request)
-        pokemon_data = await asyncio.gather(*request_tasks)
+        if output_config.resume and not output:
+            print("--resume needs the --output of the run to carry on")
+            return
 
-        if output:
-            write_all(output, pokemon_data)
+        if request.search_mode == cli_parser.SERVE:
+            async with PokedexClient(session_config, cli_parser.parse_cache_requirements(),
+                                     scheduler_config, stats) as client:
+                await PokedexDaemon(client.session, daemon_config, scheduler_config.queue_size).serve_forever()
+            return
+
+        if request.search_mode == cli_parser.QUERY:
+            query_config = cli_parser.parse_query_requirements()
+            if query_config.max_level is not None and not query_config.learns:
+                print("--max-level needs at least one --learns move")
+                return
+            cache_config = cli_parser.parse_cache_requirements()
+            async with PokedexClient(session_config, cache_config, scheduler_config, stats) as client:
+                await answer_query(client.session, request, query_config, cache_config, session_config.snapshot_path,
+                                   output_config, stats)
+            stats.report()
+            return
+
+        if request.search_mode == cli_parser.ANALYTICS:
+            analytics_config = cli_parser.parse_analytics_requirements()
+            async with PokedexClient(session_config, cli_parser.parse_cache_requirements(),
+                                     scheduler_config, stats) as client:
+                await report_analytics(client.session, request, analytics_config, session_config.snapshot_path,
+                                       output_config, stats)
+            stats.report()
+            return
+
+        if request.search_mode != cli_parser.SNAPSHOT and daemon_config.forward and \
+                can_forward(session_config, cli_parser.parse_cache_requirements(), scheduler_config):
+            client = DaemonClient(daemon_config)
+            if client.is_running():
+                forward_to_daemon(client, request, output_config, stats)
+                return
+
+        if request.search_mode == cli_parser.SNAPSHOT:
+            session_config.offline = False
+            async with PokedexClient(session_config, cli_parser.parse_cache_requirements(),
+                                     scheduler_config, stats) as client:
+                await take_snapshot(client.session, session_config.snapshot_path)
+            stats.report()
+            return
+
+        journal = open_journal(output, output_config)
+        completed = journal.completed.copy() if journal else frozenset()
+        if scheduler_config.workers > 1 and request.input_file:
+            results, length = PokeFacade.execute_sharded(request, session_config, cli_parser.parse_cache_requirements(),
+                                                         scheduler_config, completed)
+            await write_results(results, length, request, output_config, stats, journal)
         else:
-            print_all(pokemon_data)
+            async with PokedexClient(session_config, cli_parser.parse_cache_requirements(),
+                                     scheduler_config, stats, request.use_index, request.plan) as client:
+                inputs, length = PokeFacade.read_inputs(request)
+                results = client.iter_results(request.search_mode, inputs, request.is_expanded, request.fields,
+                                              completed)
+                await write_results(results, length, request, output_config, stats, journal)
+        stats.report()
 
-    except InvalidModeException as e:
+    except (InvalidModeException, InvalidQueryException, OfflineLookupError, DaemonRunningError, ImportError) as e:
         print(e)
 
 
-if __name__ == '__main__':
+def run():
+    """
+    Validates the command-line before anything heavy is imported, so --help and invalid modes return at once.
+    """
+    try:
+        request = Request(*cli_parser.parse_request_requirements())
+    except InvalidModeException as e:
+        print(e)
+        return
+    import asyncio
     if platform.system() == 'Windows':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(main())
+    asyncio.run(main(request))
+
+
+if __name__ == '__main__':
+    run()
@@ -2,59 +2,57 @@
 This file houses Pokemon, Ability, Move, and Stat Classes and other classes that are
 parameters of those aforementioned four classes.
 """
-import aiohttp
 import abc
 import json
 import asyncio
+import sys
+from itertools import chain
+from pokeretriever.pokemon_session import PokemonSession
+
+
+def _intern(value):
+    """
+    Interns value if it is a string so that identical names share one object across every PokedexObject.
+
+    :param value: String/None
+    :return: String/None
+    """
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 class PokemonStat:
     """
     PokemonStat class represents the stat field of pokemon that will return Stat class if expanded option is true.
+    The Stat is only fetched once expanded is awaited.
     """
+    __slots__ = ('_name', '_base_value', '_url', '_expanded_option', '_stat')
 
     def __init__(self, name, base_value, url, is_expanded):
-        self._name = name
+        self._name = _intern(name)
         self._base_value = base_value
-        self._url = url
+        self._url = _intern(url)
         self._expanded_option = is_expanded
+        self._stat = None
 
-    async def handle_expanded(self):
+    async def expanded(self, session: PokemonSession):
         """
-        Handles what stat information to return depending on expanded option.
+        Uses self._url to query and return the results, shared with every other PokemonStat of the same url
 
-        :return: Stat class object if expanded, dict if not
+        :return: Stat class object
         """
-        if self._expanded_option:
-            return await self.expanded()
-        else:
-            return self.not_expanded()
+        if self._stat is None:
+            self._stat = await session.get_object(self._url, self.make_stat)
+        return self._stat
 
     @staticmethod
-    async def get_request(url, session: aiohttp.ClientSession):
-        """
-        Gets request for information and puts it in json form using aiohttp.
-
-        :param url: String
-        :param session: aiohttp.ClientSession() as session.
-        :return: json
+    def make_stat(response):
         """
-        response = await session.request(method="GET", url=url)
-        json_dict = await response.json()
-        return json_dict
-
-    async def expanded(self):
-        """
-        Uses self._url to query and return the results -> Should store Stat class object
+        Makes Stat class object from the stat response.
 
+        :param response: json
         :return: Stat class object
         """
-        async with aiohttp.ClientSession() as session:
-            stuff = self.get_request(self._url, session)
-            # async_task = asyncio.create_task(coroutine)
-            response = await stuff
-            return Stat(response['is_battle_only'], response['name'], response['id'])
-        # If app is run with --expanded flag, then the URL provided must also be queried
+        return Stat(response['is_battle_only'], response['name'], response['id'])
 
     def not_expanded(self):
         """
@@ -64,6 +62,14 @@ class PokemonStat:
         """
         return {"Stat name": self._name, "Base value": self._base_value}
 
+    def to_dict(self):
+        """
+        Returns dictionary form of the Stat once it has been expanded, of the info when not expanded otherwise.
+
+        :return: dict
+        """
+        return self._stat.to_dict() if self._stat is not None else self.not_expanded()
+
     def __str__(self):
         return f"Name: {self._name}\n" \
                f"Base value: {self._base_value}\n"
@@ -72,49 +78,37 @@ class PokemonStat:
 class PokemonAbility:
     """
     PokemonAbility represents the ability field of pokemon and has the option to expand that info using the url.
+    The Ability is only fetched once expanded is awaited.
     """
+    __slots__ = ('_name', '_url', '_expanded_option', '_ability')
 
     def __init__(self, name, url, is_expanded):
-        self._name = name
-        self._url = url
+        self._name = _intern(name)
+        self._url = _intern(url)
         self._expanded_option = is_expanded
+        self._ability = None
 
-    @staticmethod
-    async def get_request(url, session: aiohttp.ClientSession):
-        """
-        Gets request for information and puts it in json form using aiohttp.
-
-        :param url: String
-        :param session: aiohttp.ClientSession() as session.
-        :return: json
+    async def expanded(self, session: PokemonSession):
         """
-        response = await session.request(method="GET", url=url)
-        json_dict = await response.json()
-        return json_dict
+        Use self._url to query and return the results, shared with every other PokemonAbility of the same url
 
-    async def handle_expanded(self):
+        :return: Ability class object
         """
-        Handles what stat information to return depending on expanded option.
+        if self._ability is None:
+            self._ability = await session.get_object(self._url, self.make_ability)
+        return self._ability
 
-        :return: Ability class object if expanded, dict if not
-        """
-        if self._expanded_option:
-            return await self.expanded()
-        else:
-            return self.not_expanded()
-
-    async def expanded(self):
+    @staticmethod
+    def make_ability(response):
         """
-        Use self._url to query and return the results -> Should store Ability class object
+        Makes Ability class object from the ability response.
 
+        :param response: json
         :return: Ability class object
         """
-        async with aiohttp.ClientSession() as session:
-            stuff = self.get_request(self._url, session)
-            response = await stuff
-            return Ability(response['generation']['name'], response['effect_entries'][1]['effect'],
-                           response['effect_entries'][1]['short_effect'],
-                           response['pokemon'], response['name'], response['id'])
+        return Ability(response['generation']['name'], response['effect_entries'][1]['effect'],
+                       response['effect_entries'][1]['short_effect'],
+                       response['pokemon'], response['name'], response['id'])
 
     def not_expanded(self):
         """
@@ -124,56 +118,51 @@ class PokemonAbility:
         """
         return {'Name': self._name}
 
+    def to_dict(self):
+        """
+        Returns dictionary form of the Ability once it has been expanded, of the info when not expanded otherwise.
+
+        :return: dict
+        """
+        return self._ability.to_dict() if self._ability is not None else self.not_expanded()
+
 
 class PokemonMove:
     """
     PokemonMove represents the move field of pokemon with option to expand that information using the url.
+    The Move is only fetched once expanded is awaited.
     """
+    __slots__ = ('_name', '_level', '_url', '_expanded_option', '_move')
 
     def __init__(self, name, level, url, is_expanded):
-        self._name = name
+        self._name = _intern(name)
         self._level = level
-        self._url = url
+        self._url = _intern(url)
         self._expanded_option = is_expanded
+        self._move = None
 
-    @staticmethod
-    async def get_request(url, session: aiohttp.ClientSession):
-        """
-        Gets request for information and puts it in json form using aiohttp.
-
-        :param url: String
-        :param session: aiohttp.ClientSession() as session.
-        :return: json
-        """
-        response = await session.request(method="GET", url=url)
-        json_dict = await response.json()
-        return json_dict
-
-    async def handle_expanded(self):
+    async def expanded(self, session: PokemonSession):
         """
-        Handles what stat information to return depending on expanded option.
+        Use self._url to query and return the results, shared with every other PokemonMove of the same url
 
-        :return: Move class object if expanded, dict if not
+        :return: Move class object
         """
-        if self._expanded_option:
-            return await self.expanded()
-        else:
-            return self.not_expanded()
+        if self._move is None:
+            self._move = await session.get_object(self._url, self.make_move)
+        return self._move
 
-    async def expanded(self):
+    @staticmethod
+    def make_move(response):
         """
-        Use self._url to query and return the results -> Should store Move class object
+        Makes Move class object from the move response.
 
+        :param response: json
         :return: Move class object
         """
-        async with aiohttp.ClientSession() as session:
-            stuff = self.get_request(self._url, session)
-            response = await stuff
-            return Move(response['generation'], response['accuracy'],
-                        response['pp'], response['power'], response['type'],
-                        response['damage_class'], response['effect_entries'][0]['short_effect'],
-                        response['name'], response['id'])
-        # If app is run with --expanded flag, then the URL provided must also be queried
+        return Move(response['generation']['name'], response['accuracy'],
+                    response['pp'], response['power'], response['type']['name'],
+                    response['damage_class']['name'], response['effect_entries'][0]['short_effect'],
+                    response['name'], response['id'])
 
     def not_expanded(self):
         """
@@ -183,16 +172,43 @@ class PokemonMove:
         """
         return {'move_name': self._name, 'level_required': self._level}
 
+    def to_dict(self):
+        """
+        Returns dictionary form of the Move once it has been expanded, of the info when not expanded otherwise.
+
+        :return: dict
+        """
+        return self._move.to_dict() if self._move is not None else self.not_expanded()
+
 
 class PokedexObject:
     """
     PokedexObject represents the return form of user's query: Pokemon, Move, or Ability
     """
+    __slots__ = ('_name', '_id')
 
     def __init__(self, name, object_id):
-        self._name = name
+        self._name = _intern(name)
         self._id = object_id
 
+    async def expand(self, session: PokemonSession):
+        """
+        Fetches the sub-resources of the object. Only Pokemon has any, so this does nothing by default.
+
+        :param session: PokemonSession shared by the whole run
+        :return: None
+        """
+        pass
+
+    def to_dict(self):
+        """
+        Returns dictionary form of the object, keyed by attribute name.
+
+        :return: dict
+        """
+        return {slot: getattr(self, slot)
+                for cls in reversed(type(self).__mro__) for slot in cls.__dict__.get('__slots__', ())}
+
 
 class PokedexObjectFactory(abc.ABC):
     """
@@ -200,37 +216,49 @@ class PokedexObjectFactory(abc.ABC):
     """
 
     @abc.abstractmethod
-    def create_object(self, response_json, request) -> PokedexObject:
+    async def create_object(self, response_json, request, session: PokemonSession) -> PokedexObject:
         pass
 
 
 class PokemonFactory(PokedexObjectFactory):
     """
-    PokemonFactory represents the factory that will create Pokemon object which inherits from PokedexObject
+    PokemonFactory represents the factory that will create Pokemon object which inherits from PokedexObject.
+    Sub-resources are not fetched here, see Pokemon.expand, and only the fields of the request's FieldProjection
+    are built.
     """
 
-    async def create_object(self, response_json, request) -> PokedexObject:
+    async def create_object(self, response_json, request, session: PokemonSession) -> PokedexObject:
         """
         Creates Pokemon class object using the response in json format and Request object.
 
         :param response_json: json
         :param request: Request class object
+        :param session: PokemonSession shared by the whole run
         :return: Pokemon class object
         """
-        stats = await asyncio.gather(*[PokemonStat(stat['stat']['name'], stat['base_stat'], stat['stat']['url'],
-                                                   request.is_expanded).handle_expanded()
-                                       for stat in response_json['stats']])
-        moves = await asyncio.gather(
-            *[PokemonMove(move['move']['name'], move['version_group_details'][0]['level_learned_at'],
-                          move['move']['url'], request.is_expanded).handle_expanded()
-              for move in response_json['moves']])
-        abilities = await asyncio.gather(*[PokemonAbility(ability['ability']['name'], ability['ability']['url'],
-                                                          request.is_expanded).handle_expanded()
-                                           for ability in response_json['abilities']])
-        return Pokemon(response_json['height'], response_json['weight'],
-                       stats, response_json['types'],
+        fields = request.fields
+
+        def wanted(field):
+            return fields is None or fields.includes(field)
+
+        def expanded(field):
+            return request.is_expanded or (fields is not None and fields.expands(field))
+
+        stats = tuple(PokemonStat(stat['stat']['name'], stat['base_stat'], stat['stat']['url'], expanded('stats'))
+                      for stat in response_json['stats']) if wanted('stats') else ()
+        moves = tuple(PokemonMove(move['move']['name'], move['version_group_details'][0]['level_learned_at'],
+                                  move['move']['url'], expanded('moves'))
+                      for move in response_json['moves']) if wanted('moves') else ()
+        abilities = tuple(PokemonAbility(ability['ability']['name'], ability['ability']['url'], expanded('abilities'))
+                          for ability in response_json['abilities']) if wanted('abilities') else ()
+        types = tuple(pokemon_type['type']['name'] for pokemon_type in response_json['types']) \
+            if wanted('types') else ()
+        return Pokemon(response_json['height'] if wanted('height') else None,
+                       response_json['weight'] if wanted('weight') else None,
+                       stats, types,
                        abilities, moves,
-                       request.is_expanded, response_json['name'], response_json['id'])
+                       request.is_expanded or bool(fields is not None and fields.sub_fields),
+                       response_json['name'], response_json['id'], fields=fields)
 
 
 class MoveFactory(PokedexObjectFactory):
@@ -238,18 +266,16 @@ class MoveFactory(PokedexObjectFactory):
     MoveFactory represents the factory that will create Move object which inherits from PokedexObject
     """
 
-    def create_object(self, response_json, request) -> PokedexObject:
+    async def create_object(self, response_json, request, session: PokemonSession) -> PokedexObject:
         """
         Creates Move class object using the response in json format and Request object.
 
         :param response_json: json
         :param request: Request class object
+        :param session: PokemonSession shared by the whole run
         :return: Move class object
         """
-        return Move(response_json['generation'], response_json['accuracy'],
-                    response_json['pp'], response_json['power'], response_json['type'],
-                    response_json['damage_class'], response_json['effect_entries'][0]['short_effect'],
-                    response_json['name'], response_json['id'])
+        return PokemonMove.make_move(response_json)
 
 
 class AbilityFactory(PokedexObjectFactory):
@@ -257,62 +283,107 @@ class AbilityFactory(PokedexObjectFactory):
     AbilityFactory represents the factory that will create Ability object which inherits from PokedexObject
     """
 
-    def create_object(self, response_json, request) -> PokedexObject:
+    async def create_object(self, response_json, request, session: PokemonSession) -> PokedexObject:
         """
         Creates Ability class object using the response in json format and Request object.
 
         :param response_json: json
         :param request: Request class object
+        :param session: PokemonSession shared by the whole run
         :return: Ability class object
         """
-        return Ability(response_json['generation']['name'],
-                       response_json['effect_entries'][1]['effect'],
-                       response_json['effect_entries'][1]['short_effect'],
-                       response_json['pokemon'], response_json['name'], response_json['id'])
+        return PokemonAbility.make_ability(response_json)
 
 
 class Pokemon(PokedexObject):
     """
     Pokemon class represents the Pokemon information that one gets when querying for certain pokemon/pokemon id.
     """
+    __slots__ = ('_height', '_weight', '_stats', '_types', '_abilities', '_moves', '_expanded_option', '_fields')
 
-    def __init__(self, height, weight, stats, types, abilities, moves, is_expanded, *basic_pokedex_info):
+    def __init__(self, height, weight, stats, types, abilities, moves, is_expanded, *basic_pokedex_info,
+                 fields=None):
         super().__init__(*basic_pokedex_info)
+        self._fields = fields
         self._height = height
         self._weight = weight
-        self._stats = stats
-        self._types = types
-        self._abilities = abilities
-        self._moves = moves
+        self._stats = tuple(stats)
+        self._types = tuple(_intern(pokemon_type) for pokemon_type in types)
+        self._abilities = tuple(abilities)
+        self._moves = tuple(moves)
         self._expanded_option = is_expanded
 
+    async def expand(self, session: PokemonSession):
+        """
+        Fetches the Stat, Ability and Move of every PokemonStat, PokemonAbility and PokemonMove whose expanded
+        option is true, every one with --expanded or those of the collections a dotted field projects.
+
+        :param session: PokemonSession shared by the whole run
+        :return: None
+        """
+        if self._expanded_option:
+            await asyncio.gather(*[field.expanded(session) for field in self._expanded_fields()])
+
+    def sub_resources(self):
+        """
+        Gets the url of every Stat, Ability and Move the Pokemon expands to, with the field that expands to it.
+
+        :return: list of (url, PokemonStat/PokemonAbility/PokemonMove) tuples, empty if expanded option is false
+        """
+        if not self._expanded_option:
+            return []
+        return [(field._url, field) for field in self._expanded_fields()]
+
+    def _expanded_fields(self):
+        return [field for field in chain(self._stats, self._abilities, self._moves) if field._expanded_option]
+
+    def _wanted(self, field):
+        return self._fields is None or self._fields.includes(field)
+
+    def _dump(self, field, items):
+        """
+        Dumps a collection as indented json, keeping only the projected fields of its items.
+
+        :param field: String, name of the collection e.g. moves
+        :param items: tuple of PokemonStat, PokemonAbility or PokemonMove
+        :return: String
+        """
+        sub_fields = self._fields.sub_fields_of(field) if self._fields is not None else None
+        dicts = [item.to_dict() for item in items]
+        if sub_fields is not None:
+            dicts = [{key: value for key, value in item.items()
+                      if key.lstrip('_') in sub_fields or key.lstrip('_') == 'name'} for item in dicts]
+        return json.dumps(dicts, sort_keys=False, indent=4)
+
     def __str__(self):
-        stats = json.dumps([stat.__dict__ if self._expanded_option else stat for stat in self._stats],
-                           sort_keys=False, indent=4)
-        abilities = json.dumps([ability.__dict__ if self._expanded_option else ability for ability in self._abilities],
-                               sort_keys=False, indent=4)
-        moves = json.dumps([move.__dict__ if self._expanded_option else move for move in self._moves],
-                           sort_keys=False, indent=4)
-        return f"Pokemon: {self._name}\n" \
-               f"Height: {self._height} decimetres\n" \
-               f"Weight: {self._weight} hectograms\n" \
-               f"Stats: {stats}\n" \
-               f"Types: {self._types}\n" \
-               f"Abilities: {abilities}\n" \
-               f"Moves: {moves}\n"
+        text = f"Pokemon: {self._name}\n"
+        if self._wanted('height'):
+            text += f"Height: {self._height} decimetres\n"
+        if self._wanted('weight'):
+            text += f"Weight: {self._weight} hectograms\n"
+        if self._wanted('stats'):
+            text += f"Stats: {self._dump('stats', self._stats)}\n"
+        if self._wanted('types'):
+            text += f"Types: {', '.join(self._types)}\n"
+        if self._wanted('abilities'):
+            text += f"Abilities: {self._dump('abilities', self._abilities)}\n"
+        if self._wanted('moves'):
+            text += f"Moves: {self._dump('moves', self._moves)}\n"
+        return text
 
 
 class Ability(PokedexObject):
     """
     Ability class represents the Ability information that one gets when querying for certain ability/ability id.
     """
+    __slots__ = ('_generation', '_effect', '_effect_short', '_pokemons')
 
     def __init__(self, generation, effect, effect_short, pokemons, *basic_pokedex_info):
         super().__init__(*basic_pokedex_info)
-        self._generation = generation
+        self._generation = _intern(generation)
         self._effect = effect
         self._effect_short = effect_short
-        self._pokemons = [pokemon['pokemon']['name'] for pokemon in pokemons]  # list of strings
+        self._pokemons = tuple(_intern(pokemon['pokemon']['name']) for pokemon in pokemons)  # tuple of strings
 
     def __str__(self):
         return f"Name: {self._name}\n" \
@@ -320,13 +391,14 @@ class Ability(PokedexObject):
                f"Generation: {self._generation}\n" \
                f"Effect: {self._effect}\n" \
                f"Short Effect: {self._effect_short}\n" \
-               f"Pokemons: {self._pokemons}\n"
+               f"Pokemons: {list(self._pokemons)}\n"
 
 
 class Stat(PokedexObject):
     """
     Stat class represents the stat information that user gets when querying for certain stat/stat id.
     """
+    __slots__ = ('_is_battle_only',)
 
     def __init__(self, is_battle_only, *basic_pokedex_info):
         super().__init__(*basic_pokedex_info)
@@ -342,15 +414,16 @@ class Move(PokedexObject):
     """
     Move class represents the move information that user gets when querying for certain move/move id.
     """
+    __slots__ = ('_generation', '_accuracy', '_pp', '_power', '_type', '_damage_class', '_effect_short')
 
     def __init__(self, generation, accuracy, pp, power, move_type, damage_class, effect_short, *basic_pokedex_info):
         super().__init__(*basic_pokedex_info)
-        self._generation = generation
+        self._generation = _intern(generation)
         self._accuracy = accuracy
         self._pp = pp
         self._power = power
-        self._type = move_type
-        self._damage_class = damage_class
+        self._type = _intern(move_type)
+        self._damage_class = _intern(damage_class)
         self._effect_short = effect_short
 
     def __str__(self):
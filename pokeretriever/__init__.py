@@ -0,0 +1,23 @@
+"""
+The pokeretriever package looks up Pokemon, moves and abilities from PokeAPI. PokedexClient is its async library API.
+The exports are imported on first use, so importing a single module such as cli_parser stays cheap.
+"""
+import importlib
+
+_EXPORTS = {
+    'PokedexClient': 'pokeretriever.pokemon_client',
+    'FailedRequest': 'pokeretriever.pokemon_parser',
+    'FieldProjection': 'pokeretriever.pokemon_requests',
+    'SessionConfig': 'pokeretriever.pokemon_requests',
+    'CacheConfig': 'pokeretriever.pokemon_requests',
+    'SchedulerConfig': 'pokeretriever.pokemon_requests',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'pokeretriever' has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
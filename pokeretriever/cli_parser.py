@@ -1,11 +1,21 @@
 """
 This module contains a custom Exception class and methods to help parse CLI arguments.
 """
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from functools import lru_cache
+from pokeretriever.pokemon_requests import FieldProjection, SessionConfig, CacheConfig, SchedulerConfig, OutputConfig, \
+    StatsConfig, DaemonConfig, QueryConfig, AnalyticsConfig, DECODERS
 
 POKEMON = 'pokemon'
 ABILITY = 'ability'
 MOVE = 'move'
+MIXED = 'mixed'
+QUERY = 'query'
+ANALYTICS = 'analytics'
+SNAPSHOT = 'snapshot'
+SERVE = 'serve'
+
+OUTPUT_FORMATS = ('text', 'jsonl', 'csv', 'columnar')
 
 
 class InvalidModeException(Exception):
@@ -15,22 +25,164 @@ class InvalidModeException(Exception):
     pass
 
 
+def _parse_percentiles(text):
+    """
+    Parses comma separated percentiles.
+
+    :param text: String, e.g. 25,50,75
+    :return: tuple of floats, raises ArgumentTypeError if one is not a number between 0 and 100
+    """
+    try:
+        percentiles = tuple(float(percentile) for percentile in text.split(',') if percentile.strip())
+    except ValueError:
+        raise ArgumentTypeError(f"'{text}' is not a comma separated list of numbers") from None
+    if any(not 0 <= percentile <= 100 for percentile in percentiles):
+        raise ArgumentTypeError("Percentiles must be between 0 and 100")
+    return percentiles
+
+
+@lru_cache(maxsize=None)
 def _parse_cli_arguments() -> Namespace:
     """
-    Parses CLI arguments.
+    Parses CLI arguments once, every parse_*_requirements function shares the result.
 
     :return: Namespace
     """
     parser = ArgumentParser()
     parser.add_argument(
-        "mode", help="Change between Pokemon, ability, and move search mode.")
+        "mode", help=f"Change between Pokemon, ability, and move search mode, {MIXED} for input lines such as "
+                     f"move:tackle or {{\"mode\": \"ability\", \"query\": \"65\"}} (plain lines are Pokemon), "
+                     f"{QUERY} to find Pokemon by the moves, types and abilities they have, {ANALYTICS} to rank "
+                     f"and aggregate the stats of every Pokemon or move, "
+                     f"{SNAPSHOT} to crawl every resource into the local snapshot, or {SERVE} to run the lookup "
+                     f"daemon. Every search mode accepts the mode:query form.")
     parser.add_argument('--expanded', action='store_true')
+    parser.add_argument('--fields', help="Comma separated fields to fetch and keep, e.g. name,types,stats or "
+                                         "moves.power. Only the listed collections are expanded.")
+    parser.add_argument('--plan', action='store_true',
+                        help="With --expanded, fetch the Pokemon of each batch first, then every Stat, Ability and "
+                             "Move they need once, the most shared first, and report the fetches saved.")
+    parser.add_argument('--no-index', action='store_true',
+                        help="Don't validate queries against the name index before requesting them.")
     data_group = parser.add_mutually_exclusive_group()
     parser.add_argument('--output')
     data_group.add_argument(
-        "--inputfile", help="The text file that has pokemon, abilities, and moves to search for.")
+        "--inputfile", help="The text file that has pokemon, abilities, and moves to search for. "
+                            "May be gzip-compressed, or - to read from stdin.")
     data_group.add_argument(
         "--inputdata", help="The input name must be provided")
+    output_group = parser.add_argument_group("output")
+    output_group.add_argument('--format', choices=OUTPUT_FORMATS, default=OutputConfig.format,
+                              help="Layout of the results: readable text, JSON Lines, CSV or columnar row groups.")
+    output_group.add_argument('--ordered', action='store_true',
+                              help="Write results in input order instead of as they complete.")
+    output_group.add_argument('--flush-every', type=int, default=OutputConfig.flush_every,
+                              help="Number of results written between flushes of the output.")
+    output_group.add_argument('--flush-interval', type=float, default=OutputConfig.flush_interval,
+                              help="Maximum seconds between flushes of the output.")
+    output_group.add_argument('--resume', action='store_true',
+                              help="Carry on an interrupted --journal run: skip the inputs the journal of --output "
+                                   "has as done and append the rest.")
+    output_group.add_argument('--journal', action='store_true',
+                              help="Keep a journal next to --output, synced to disk on every flush, so an "
+                                   "interrupted run can be carried on with --resume. It is removed once the run "
+                                   "finishes.")
+    query_group = parser.add_argument_group("query")
+    query_group.add_argument('--learns', action='append', default=[],
+                             help="Move the Pokemon learns, may be repeated.")
+    query_group.add_argument('--type', action='append', default=[], dest='types',
+                             help="Type the Pokemon or move has, may be repeated.")
+    query_group.add_argument('--ability', action='append', default=[], dest='abilities',
+                             help="Ability the Pokemon can have, may be repeated.")
+    query_group.add_argument('--max-level', type=int,
+                             help="Highest level by which the --learns moves are learned by levelling up.")
+    query_group.add_argument('--relations', default=QueryConfig.index_path,
+                             help="Path the move, type and ability indexes are saved to, relations.json in the "
+                                  "--cache-dir by default.")
+    query_group.add_argument('--rebuild-index', action='store_true',
+                             help="Build the move, type and ability indexes again even if they are saved.")
+    analytics_group = parser.add_argument_group("analytics")
+    analytics_group.add_argument('--table', choices=(POKEMON, MOVE), default=AnalyticsConfig.table,
+                                 help="Whether every Pokemon or every move is analysed.")
+    analytics_group.add_argument('--top', type=int, default=AnalyticsConfig.top,
+                                 help="Number of Pokemon or moves ranked, 0 for none.")
+    analytics_group.add_argument('--by', help="Column the ranking is by, e.g. speed, total, weight or power. "
+                                              "Defaults to total for Pokemon and power for moves.")
+    analytics_group.add_argument('--where', action='append', default=[],
+                                 help="Condition such as speed>100 or accuracy>=90, may be repeated.")
+    analytics_group.add_argument('--percentiles', type=_parse_percentiles, default=(),
+                                 help="Comma separated percentiles of every column, e.g. 25,50,75.")
+    analytics_group.add_argument('--team', action='append', default=[], dest='teams',
+                                 help="Comma separated team members to aggregate, optionally named as "
+                                      "name=member,member. May be repeated.")
+    daemon_group = parser.add_argument_group("daemon")
+    daemon_group.add_argument('--socket', default=DaemonConfig.socket_path,
+                              help="Unix socket the daemon listens on, empty to use --host and --port instead.")
+    daemon_group.add_argument('--host', default=DaemonConfig.host, help="Host the daemon listens on.")
+    daemon_group.add_argument('--port', type=int, default=DaemonConfig.port, help="Port the daemon listens on.")
+    daemon_group.add_argument('--no-daemon', action='store_true',
+                              help="Do the lookups in this process even if a daemon is running. They also are when "
+                                   "any connection, cache, snapshot or scheduling option is given, which the daemon "
+                                   "would ignore.")
+    stats_group = parser.add_argument_group("instrumentation")
+    stats_group.add_argument('--stats', action='store_true',
+                             help="Print counts, latency histograms and cache hit ratios of the run to stderr.")
+    stats_group.add_argument('--trace', help="Write a Chrome trace JSON file of the run, implies --stats.")
+    pool_group = parser.add_argument_group("connection pool")
+    pool_group.add_argument('--pool-size', type=int, default=SessionConfig.pool_size,
+                            help="Maximum number of open connections.")
+    pool_group.add_argument('--pool-per-host', type=int, default=SessionConfig.pool_per_host,
+                            help="Maximum number of open connections to a single host.")
+    pool_group.add_argument('--keepalive-timeout', type=float, default=SessionConfig.keepalive_timeout,
+                            help="Seconds an idle connection is kept alive for reuse.")
+    pool_group.add_argument('--dns-cache-ttl', type=int, default=SessionConfig.dns_cache_ttl,
+                            help="Seconds a resolved host name is cached.")
+    pool_group.add_argument('--memo-size', type=int, default=SessionConfig.memo_size,
+                            help="Number of parsed stats, moves and abilities kept in memory during the run.")
+    pool_group.add_argument('--snapshot', default=SessionConfig.snapshot_path,
+                            help="Path of the local Pokedex snapshot, a SQLite file or, ending in .pkdx, a compact "
+                                 "binary file offline mode maps into memory.")
+    pool_group.add_argument('--base-url', default=SessionConfig.base_url,
+                            help="Root of the API requests are sent to, e.g. a local PokeAPI stand-in.")
+    pool_group.add_argument('--offline', action='store_true',
+                            help="Resolve everything from the local snapshot without using the network.")
+    pool_group.add_argument('--decoder', choices=DECODERS, default=SessionConfig.decoder,
+                            help="JSON library responses are decoded with, auto picks orjson or simdjson when "
+                                 "installed.")
+    pool_group.add_argument('--no-prune', action='store_true',
+                            help="Keep and cache whole responses instead of only the fields that are read.")
+    scheduler_group = parser.add_argument_group("request scheduling")
+    scheduler_group.add_argument('--concurrency', type=int, default=SchedulerConfig.concurrency,
+                                 help="Maximum number of requests in flight.")
+    scheduler_group.add_argument('--rate', type=float, default=SchedulerConfig.rate,
+                                 help="Maximum requests per second, 0 for no limit.")
+    scheduler_group.add_argument('--burst', type=float, default=SchedulerConfig.burst,
+                                 help="Requests allowed in a burst above the rate, defaults to the rate.")
+    scheduler_group.add_argument('--retries', type=int, default=SchedulerConfig.retries,
+                                 help="Retries of a throttled, failing or timed out request.")
+    scheduler_group.add_argument('--backoff', type=float, default=SchedulerConfig.backoff_base,
+                                 help="Base delay in seconds of the exponential backoff between retries.")
+    scheduler_group.add_argument('--timeout', type=float, default=SchedulerConfig.timeout,
+                                 help="Seconds before a single request attempt times out.")
+    scheduler_group.add_argument('--queue-size', type=int, default=SchedulerConfig.queue_size,
+                                 help="Maximum number of input queries being looked up at once.")
+    scheduler_group.add_argument('--workers', type=int, default=SchedulerConfig.workers,
+                                 help="Number of processes an input file is sharded across. They share the response "
+                                      "cache and split the rate and concurrency limits.")
+    cache_group = parser.add_argument_group("response cache")
+    cache_group.add_argument('--cache-dir', default=CacheConfig.cache_dir,
+                             help="Directory of the on-disk response cache.")
+    cache_group.add_argument('--cache-size', type=int, default=CacheConfig.max_bytes // (1024 * 1024),
+                             help="Maximum size of the cached responses in megabytes.")
+    cache_group.add_argument('--no-cache', action='store_true', help="Neither read nor write the response cache.")
+    cache_group.add_argument('--refresh', action='store_true',
+                             help="Check every cached response with the API before using it, fetching only the "
+                                  "ones that changed.")
+    cache_group.add_argument('--no-revalidate', action='store_true',
+                             help="Fetch expired responses again instead of serving them while they are "
+                                  "revalidated in the background.")
+    cache_group.add_argument('--revalidate-batch', type=int, default=CacheConfig.revalidate_batch,
+                             help="Number of expired responses revalidated at once in the background.")
 
     return parser.parse_args()
 
@@ -56,19 +208,22 @@ def _parse_mode(mode_arg):
     :param mode_arg: String, search mode of Request object
     :return: String/None, returns mode_arg if valid_option, raises InvalidModeException if not
     """
-    valid_option = mode_arg == POKEMON or mode_arg == ABILITY or mode_arg == MOVE
+    valid_option = mode_arg == POKEMON or mode_arg == ABILITY or mode_arg == MOVE or mode_arg == MIXED or \
+        mode_arg == QUERY or mode_arg == ANALYTICS or mode_arg == SNAPSHOT or mode_arg == SERVE
 
     if valid_option:
         return mode_arg
     else:
         raise InvalidModeException(
-            f"Mode must be {POKEMON} or {ABILITY} or {MOVE}!")
+            f"Mode must be {POKEMON} or {ABILITY} or {MOVE} or {MIXED} or {QUERY} or {ANALYTICS} or {SNAPSHOT} or "
+            f"{SERVE}!")
 
 
 def parse_request_requirements():
     """Parses request data from the command-line.
 
-    :return: tuple (search_mode:str, inputfile:str|None, inputdata:str|None, is_expanded:bool)
+    :return: tuple (search_mode:str, inputfile:str|None, inputdata:str|None, is_expanded:bool, output:str|None,
+             use_index:bool, fields:FieldProjection|None, plan:bool)
     """
     parsed_data = _parse_cli_arguments()
 
@@ -76,4 +231,105 @@ def parse_request_requirements():
 
     is_expanded = parsed_data.expanded
 
-    return mode, parsed_data.inputfile, parsed_data.inputdata, is_expanded, parsed_data.output
+    return mode, parsed_data.inputfile, parsed_data.inputdata, is_expanded, parsed_data.output, \
+        not parsed_data.no_index, FieldProjection.parse(parsed_data.fields), parsed_data.plan
+
+
+def parse_session_requirements() -> SessionConfig:
+    """Parses the connection pool settings from the command-line.
+
+    :return: SessionConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    return SessionConfig(parsed_data.pool_size, parsed_data.pool_per_host,
+                         parsed_data.keepalive_timeout, parsed_data.dns_cache_ttl, parsed_data.memo_size,
+                         parsed_data.snapshot, parsed_data.offline, parsed_data.base_url, parsed_data.decoder,
+                         not parsed_data.no_prune)
+
+
+def parse_cache_requirements() -> CacheConfig:
+    """Parses the response cache settings from the command-line.
+
+    :return: CacheConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    return CacheConfig(cache_dir=parsed_data.cache_dir, enabled=not parsed_data.no_cache,
+                       refresh=parsed_data.refresh, max_bytes=parsed_data.cache_size * 1024 * 1024,
+                       revalidate=not parsed_data.no_revalidate, revalidate_batch=parsed_data.revalidate_batch)
+
+
+def parse_scheduler_requirements() -> SchedulerConfig:
+    """Parses the request scheduling limits from the command-line.
+
+    :return: SchedulerConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    return SchedulerConfig(concurrency=parsed_data.concurrency, rate=parsed_data.rate, burst=parsed_data.burst,
+                           retries=parsed_data.retries, backoff_base=parsed_data.backoff,
+                           timeout=parsed_data.timeout, queue_size=parsed_data.queue_size,
+                           workers=max(1, parsed_data.workers))
+
+
+def parse_output_requirements() -> OutputConfig:
+    """Parses the output streaming settings from the command-line.
+
+    :return: OutputConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    return OutputConfig(format=parsed_data.format, ordered=parsed_data.ordered, flush_every=parsed_data.flush_every,
+                        flush_interval=parsed_data.flush_interval, journal=parsed_data.journal,
+                        resume=parsed_data.resume)
+
+
+def parse_stats_requirements() -> StatsConfig:
+    """Parses the instrumentation settings from the command-line.
+
+    :return: StatsConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    return StatsConfig(enabled=parsed_data.stats or parsed_data.trace is not None, trace_path=parsed_data.trace)
+
+
+def parse_daemon_requirements() -> DaemonConfig:
+    """Parses where the lookup daemon listens from the command-line.
+
+    :return: DaemonConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    return DaemonConfig(socket_path=parsed_data.socket or None, host=parsed_data.host, port=parsed_data.port,
+                        forward=not parsed_data.no_daemon)
+
+
+def parse_query_requirements() -> QueryConfig:
+    """Parses the filters of a relational query from the command-line.
+
+    :return: QueryConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    return QueryConfig(learns=tuple(parsed_data.learns), types=tuple(parsed_data.types),
+                       abilities=tuple(parsed_data.abilities), max_level=parsed_data.max_level,
+                       index_path=parsed_data.relations, rebuild=parsed_data.rebuild_index)
+
+
+def parse_analytics_requirements() -> AnalyticsConfig:
+    """Parses what an analytics report is computed over from the command-line.
+
+    :return: AnalyticsConfig
+    """
+    parsed_data = _parse_cli_arguments()
+
+    teams = []
+    for number, team in enumerate(parsed_data.teams, start=1):
+        name, _, members = team.rpartition('=')
+        teams.append((name.strip() or f"team-{number}",
+                      tuple(member for member in members.split(',') if member.strip())))
+    return AnalyticsConfig(table=parsed_data.table, top=max(0, parsed_data.top), by=parsed_data.by,
+                           where=tuple(parsed_data.where), types=tuple(parsed_data.types),
+                           percentiles=parsed_data.percentiles, teams=tuple(teams))
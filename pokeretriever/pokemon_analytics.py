@@ -0,0 +1,246 @@
+"""
+This module contains ColumnTable class, the NumPy column arrays of every Pokemon or move that analytics are computed
+on, and AnalyticsRow class, a row of an analytics report. NumPy is optional, it is only imported once analytics are
+run.
+"""
+import operator
+import re
+from pokeretriever.pokemon_index import InvalidQueryException, NameIndex
+from pokeretriever.pokemon_requests import Modes, AnalyticsConfig
+from pokeretriever.pokemon_snapshot import load_resources
+
+POKEMON_TABLE = 'pokemon'
+MOVE_TABLE = 'move'
+STAT_COLUMNS = ('hp', 'attack', 'defense', 'special_attack', 'special_defense', 'speed')
+POKEMON_COLUMNS = STAT_COLUMNS + ('total', 'height', 'weight')
+MOVE_COLUMNS = ('power', 'accuracy', 'pp')
+DEFAULT_SORT_COLUMNS = {POKEMON_TABLE: 'total', MOVE_TABLE: 'power'}
+
+COMPARISONS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge, '==': operator.eq,
+               '!=': operator.ne}
+CONDITION_PATTERN = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def import_numpy():
+    """
+    Imports NumPy, which only analytics need.
+
+    :return: module
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Analytics need NumPy, pip install numpy") from None
+    return numpy
+
+
+class AnalyticsRow:
+    """
+    AnalyticsRow represents one row of an analytics report: a top ranked Pokemon or move, a percentile of every
+    column or the aggregates of a team. LABEL_FIELDS name the row in its text form.
+    """
+    __slots__ = ('_kind', '_values')
+    LABEL_FIELDS = ('rank', 'name', 'percentile')
+
+    def __init__(self, kind, values):
+        self._kind = kind
+        self._values = values
+
+    def __str__(self):
+        label = " ".join(str(self._values[field]) for field in self.LABEL_FIELDS if field in self._values)
+        details = ", ".join(f"{field} {value}" for field, value in self._values.items()
+                            if field not in self.LABEL_FIELDS and field != 'id' and value is not None)
+        return f"{self._kind} {label}: {details}"
+
+
+class ColumnTable:
+    """
+    ColumnTable represents a resource type as NumPy columns, one array per numeric field with NaN where a value is
+    missing, plus a boolean type membership matrix. Filters, rankings, percentiles and team aggregates are computed
+    on whole columns at once instead of looping over objects.
+    """
+
+    def __init__(self, kind, names, ids, columns, type_names, type_matrix):
+        self._np = import_numpy()
+        self._kind = kind
+        self._names = names  # list of strings, in row order
+        self._ids = ids  # int array
+        self._columns = columns  # dict of column name to float array
+        self._type_names = type_names  # list of strings, in type matrix column order
+        self._type_matrix = type_matrix  # bool array of shape (rows, types)
+        self._rows = {name: row for row, name in enumerate(names)}
+
+    def __len__(self):
+        return len(self._names)
+
+    @classmethod
+    def from_responses(cls, kind, responses):
+        """
+        Builds the columns of a Pokemon or move table from their responses.
+
+        :param kind: String, pokemon or move
+        :param responses: list of json
+        :return: ColumnTable
+        """
+        np = import_numpy()
+        responses = sorted(responses, key=lambda response: response['id'])
+        if kind == POKEMON_TABLE:
+            rows = [cls._pokemon_row(response) for response in responses]
+            names = POKEMON_COLUMNS
+            types = [[pokemon_type['type']['name'] for pokemon_type in response['types']] for response in responses]
+        else:
+            rows = [[response.get(column) for column in MOVE_COLUMNS] for response in responses]
+            names = MOVE_COLUMNS
+            types = [[response['type']['name']] if response.get('type') else [] for response in responses]
+        matrix = np.array([[np.nan if value is None else value for value in row] for row in rows],
+                          dtype=float).reshape(len(rows), len(names))
+        columns = {name: matrix[:, index] for index, name in enumerate(names)}
+        type_names = sorted({type_name for row_types in types for type_name in row_types})
+        type_columns = {type_name: index for index, type_name in enumerate(type_names)}
+        type_matrix = np.zeros((len(rows), len(type_names)), dtype=bool)
+        for row, row_types in enumerate(types):
+            type_matrix[row, [type_columns[type_name] for type_name in row_types]] = True
+        return cls(kind, [response['name'] for response in responses],
+                   np.array([response['id'] for response in responses], dtype=np.int64), columns, type_names,
+                   type_matrix)
+
+    @staticmethod
+    def _pokemon_row(response):
+        stats = {stat['stat']['name'].replace('-', '_'): stat['base_stat'] for stat in response['stats']}
+        values = [stats.get(column) for column in STAT_COLUMNS]
+        total = sum(value for value in values if value is not None)
+        return values + [total, response.get('height'), response.get('weight')]
+
+    def column(self, name):
+        """
+        Gets a column by name.
+
+        :param name: String
+        :return: float array
+        """
+        column = self._columns.get(name.strip().lower().replace('-', '_'))
+        if column is None:
+            raise InvalidQueryException(f"'{name}' is not a {self._kind} column, use one of "
+                                        f"{', '.join(self._columns)}.")
+        return column
+
+    def mask(self, conditions=(), types=()):
+        """
+        Gets the rows that meet every condition and have every type.
+
+        :param conditions: iterable of strings such as "speed>100" or "power>=90"
+        :param types: iterable of type names
+        :return: bool array
+        """
+        mask = self._np.ones(len(self._names), dtype=bool)
+        for condition in conditions:
+            match = CONDITION_PATTERN.match(condition)
+            if match is None:
+                raise InvalidQueryException(f"'{condition}' is not a condition such as speed>100.")
+            name, comparison, value = match.groups()
+            mask &= COMPARISONS[comparison](self.column(name), float(value))
+        for content in types:
+            type_name = NameIndex.normalise(content)
+            if type_name not in self._type_names:
+                suggestions = NameIndex('type', enumerate(self._type_names)).suggest(type_name)
+                hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+                raise InvalidQueryException(f"No {self._kind} has the type '{content.strip()}'.{hint}")
+            mask &= self._type_matrix[:, self._type_names.index(type_name)]
+        return mask
+
+    def _row_of(self, content):
+        key = NameIndex.normalise(content)
+        row = self._rows.get(key)
+        if row is None:
+            suggestions = NameIndex(self._kind, enumerate(self._names)).suggest(key)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            raise InvalidQueryException(f"'{content.strip()}' is not a valid {self._kind}.{hint}")
+        return row
+
+    def _values(self, row):
+        return {name: self._to_python(column[row]) for name, column in self._columns.items()}
+
+    def _to_python(self, value):
+        if self._np.isnan(value):
+            return None
+        return int(value) if float(value).is_integer() else round(float(value), 2)
+
+    def top(self, by, count, mask):
+        """
+        Ranks the rows in mask by a column, highest first, rows missing the column last.
+
+        :param by: String, column name
+        :param count: Integer, number of rows to rank
+        :param mask: bool array
+        :return: list of AnalyticsRow
+        """
+        column = self.column(by)
+        rows = self._np.flatnonzero(mask)
+        ranked = rows[self._np.argsort(-column[rows], kind='stable')][:count]
+        return [AnalyticsRow('top', {'rank': rank, 'id': int(self._ids[row]), 'name': self._names[row],
+                                     **self._values(row)})
+                for rank, row in enumerate(ranked, start=1)]
+
+    def percentiles(self, percentiles, mask):
+        """
+        Computes percentiles of every column over the rows in mask.
+
+        :param percentiles: iterable of numbers between 0 and 100
+        :param mask: bool array
+        :return: list of AnalyticsRow, one per percentile
+        """
+        if not mask.any():
+            return []
+        names = list(self._columns)
+        matrix = self._np.column_stack([self._columns[name] for name in names])[mask]
+        values = self._np.nanpercentile(matrix, list(percentiles), axis=0)
+        return [AnalyticsRow('percentile', {'percentile': self._to_python(percentile),
+                                            **{name: self._to_python(value) for name, value in zip(names, row)}})
+                for percentile, row in zip(percentiles, values)]
+
+    def team(self, name, members):
+        """
+        Aggregates the columns over a team: the mean of every column and, for Pokemon, the sum of their totals.
+
+        :param name: String, name of the team
+        :param members: iterable of names
+        :return: AnalyticsRow
+        """
+        rows = [self._row_of(member) for member in members]
+        values = {'name': name, 'members': ",".join(self._names[row] for row in rows)}
+        for column_name, column in self._columns.items():
+            values[column_name] = self._to_python(self._np.nanmean(column[rows])) \
+                if not self._np.isnan(column[rows]).all() else None
+        if 'total' in self._columns:
+            values['team_total'] = self._to_python(self._columns['total'][rows].sum())
+        return AnalyticsRow('team', values)
+
+    def report(self, config: AnalyticsConfig):
+        """
+        Makes the report config asks for: the top ranked rows, the percentiles and the team aggregates.
+
+        :param config: AnalyticsConfig
+        :return: list of AnalyticsRow
+        """
+        mask = self.mask(config.where, config.types)
+        rows = []
+        if config.top:
+            rows.extend(self.top(config.by or DEFAULT_SORT_COLUMNS[self._kind], config.top, mask))
+        rows.extend(self.percentiles(config.percentiles, mask))
+        rows.extend(self.team(name, members) for name, members in config.teams)
+        return rows
+
+
+async def load_column_table(session, table, snapshot_path):
+    """
+    Builds the ColumnTable of every Pokemon or move, from the snapshot when it has them, otherwise through the
+    session and its response cache.
+
+    :param session: PokemonSession
+    :param table: String, pokemon or move
+    :param snapshot_path: String, filepath of the snapshot
+    :return: ColumnTable
+    """
+    import_numpy()
+    mode = Modes.POKEMON if table == POKEMON_TABLE else Modes.MOVE
+    return ColumnTable.from_responses(table, await load_resources(session, snapshot_path, mode))
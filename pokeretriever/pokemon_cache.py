@@ -0,0 +1,218 @@
+"""
+This module contains ResponseCache class, the persistent on-disk cache of PokeAPI responses, and ObjectMemo class,
+the in-memory cache of parsed objects.
+"""
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+
+class CachedResponse:
+    """
+    CachedResponse represents a cached body with the validators PokeAPI sent it with, ETag and Last-Modified, which
+    a conditional GET checks a stale body against.
+    """
+    __slots__ = ('body', 'is_fresh', 'etag', 'last_modified')
+
+    def __init__(self, body, is_fresh, etag=None, last_modified=None):
+        self.body = body
+        self.is_fresh = is_fresh
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def has_validators(self):
+        return self.etag is not None or self.last_modified is not None
+
+
+class ResponseCache:
+    """
+    ResponseCache represents a content-addressed SQLite store of raw response bodies. Entries expire after a TTL
+    that depends on their resource type and the least recently used entries are evicted once the total size of
+    the bodies goes over max_bytes. The validators of each response are stored with it, so an expired entry can be
+    revalidated instead of fetched again.
+    """
+    DEFAULT_TTL = 24 * 60 * 60
+    EVICTION_LOW_WATER = 0.9
+    DB_NAME = "responses.sqlite3"
+
+    def __init__(self, cache_dir, max_bytes, ttls: dict):
+        os.makedirs(cache_dir, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._ttls = ttls
+        self._db = sqlite3.connect(os.path.join(cache_dir, self.DB_NAME), isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries ("
+                         "key TEXT PRIMARY KEY, url TEXT NOT NULL, kind TEXT NOT NULL, body BLOB NOT NULL, "
+                         "size INTEGER NOT NULL, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self._add_validator_columns()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _add_validator_columns(self):
+        """
+        Adds the validator columns to caches created before they were stored.
+
+        :return: None
+        """
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        for column in ('etag', 'last_modified'):
+            if column not in columns:
+                try:
+                    self._db.execute(f"ALTER TABLE entries ADD COLUMN {column} TEXT")
+                except sqlite3.OperationalError:
+                    pass  # another process sharing the cache added it first
+
+    @staticmethod
+    def normalise_url(url):
+        """
+        Normalises url so that trailing slashes and letter case don't create duplicate entries.
+
+        :param url: String
+        :return: String
+        """
+        return url.strip().rstrip("/").lower()
+
+    @staticmethod
+    def resource_kind(url):
+        """
+        Gets the resource type of url, the path segment that follows the API version.
+
+        :param url: String, e.g. https://pokeapi.co/api/v2/move/5/
+        :return: String, e.g. move
+        """
+        segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+        for index, segment in enumerate(segments[:-1]):
+            if segment.startswith("v") and segment[1:].isdigit():
+                return segments[index + 1]
+        return segments[-2] if len(segments) > 1 else ""
+
+    @classmethod
+    def make_key(cls, url):
+        """
+        Makes the content address of url.
+
+        :param url: String
+        :return: String, sha256 hex digest
+        """
+        return hashlib.sha256(cls.normalise_url(url).encode("utf-8")).hexdigest()
+
+    def lookup(self, url):
+        """
+        Gets the cached body of url with its validators, whether it is still fresh or not.
+
+        :param url: String
+        :return: CachedResponse/None
+        """
+        key = self.make_key(url)
+        row = self._db.execute("SELECT body, kind, fetched_at, etag, last_modified FROM entries WHERE key = ?",
+                               (key,)).fetchone()
+        if row is None:
+            return None
+        body, kind, fetched_at, etag, last_modified = row
+        now = time.time()
+        self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return CachedResponse(body, now - fetched_at <= self._ttls.get(kind, self.DEFAULT_TTL), etag, last_modified)
+
+    def put(self, url, body: bytes, etag=None, last_modified=None):
+        """
+        Stores body as the cached response of url and evicts least recently used entries if over max_bytes.
+
+        :param url: String
+        :param body: bytes
+        :param etag: String/None, ETag header of the response
+        :param last_modified: String/None, Last-Modified header of the response
+        :return: None
+        """
+        key = self.make_key(url)
+        now = time.time()
+        previous = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        self._db.execute("INSERT OR REPLACE INTO entries (key, url, kind, body, size, fetched_at, accessed_at, etag, "
+                         "last_modified) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (key, self.normalise_url(url), self.resource_kind(url), body, len(body), now, now, etag,
+                          last_modified))
+        self._total_bytes += len(body) - (previous[0] if previous else 0)
+        if self._total_bytes > self._max_bytes:
+            self._evict()
+
+    def touch(self, urls):
+        """
+        Marks the entries of urls as fetched now, after the API confirmed they have not changed.
+
+        :param urls: iterable of strings
+        :return: None
+        """
+        now = time.time()
+        self._db.executemany("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                             [(now, now, self.make_key(url)) for url in urls])
+
+    def _evict(self):
+        """
+        Deletes least recently used entries until the total size is back under the low water mark of max_bytes.
+        The total is read again first since other processes may share the cache.
+
+        :return: None
+        """
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        target = self._max_bytes * self.EVICTION_LOW_WATER
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def close(self):
+        """
+        Closes the SQLite connection.
+
+        :return: None
+        """
+        self._db.close()
+
+
+class ObjectMemo:
+    """
+    ObjectMemo represents the in-memory LRU of parsed sub-resources (Stat, Move, Ability) kept for the life of a
+    run, so that a resource shared by many Pokemon is only parsed once and every Pokemon references one instance.
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._objects = OrderedDict()
+
+    def get(self, key):
+        """
+        Gets the object stored under key and marks it as recently used.
+
+        :param key: String
+        :return: object/None
+        """
+        pokedex_object = self._objects.get(key)
+        if pokedex_object is not None:
+            self._objects.move_to_end(key)
+        return pokedex_object
+
+    def put(self, key, pokedex_object):
+        """
+        Stores pokedex_object under key and drops the least recently used object if over max_size.
+
+        :param key: String
+        :param pokedex_object: object
+        :return: None
+        """
+        if self._max_size <= 0:
+            return
+        self._objects[key] = pokedex_object
+        self._objects.move_to_end(key)
+        if len(self._objects) > self._max_size:
+            self._objects.popitem(last=False)
+
+    def __len__(self):
+        return len(self._objects)
@@ -0,0 +1,145 @@
+"""
+This module contains PokedexClient class, the async library API for looking up Pokemon, moves and abilities from
+other asyncio code without going through driver.py.
+"""
+from pokeretriever.cli_parser import POKEMON, ABILITY, MOVE, MIXED, _parse_mode
+from pokeretriever.pokemon_parser import FailedRequest
+from pokeretriever.pokemon_requests import Request, FieldProjection, SessionConfig, CacheConfig, SchedulerConfig
+from pokeretriever.pokemon_session import PokemonSession
+from pokeretriever.pokemon_stats import NullStats
+
+
+class PokedexClient:
+    """
+    PokedexClient represents a long-lived lookup client. It owns a PokemonSession, so its connection pool, response
+    cache, object memo, rate limits and name indexes stay warm for as long as the client is open and are shared by
+    every lookup made through it. Use it as an async context manager, or call open and close.
+
+    Single lookups return the PokedexObject or raise what the lookup failed with. Batch lookups never raise for a
+    single query, they return a FailedRequest in its place. With plan, expanded batch lookups fetch the sub-resources
+    their Pokemon share once each through a BatchPlanner.
+    """
+
+    def __init__(self, session_config: SessionConfig = None, cache_config: CacheConfig = None,
+                 scheduler_config: SchedulerConfig = None, stats: NullStats = None, use_index=True, plan=False):
+        self._scheduler_config = scheduler_config or SchedulerConfig()
+        self._session = PokemonSession(session_config, cache_config, self._scheduler_config, stats)
+        self._use_index = use_index
+        self._plan = plan
+        self._name_indexes = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def session(self):
+        """
+        PokemonSession the client looks everything up with.
+        """
+        return self._session
+
+    async def open(self):
+        """
+        Opens the session of the client.
+
+        :return: None
+        """
+        await self._session.open()
+
+    async def close(self):
+        """
+        Closes the session of the client, its connection pool and its response cache.
+
+        :return: None
+        """
+        await self._session.close()
+
+    async def get(self, mode, query, expanded=False, fields=None):
+        """
+        Looks up a single query.
+
+        :param mode: String, pokemon, ability, move or mixed
+        :param query: String, name or id, or mode:query in mixed mode
+        :param expanded: bool, whether the stats, abilities and moves of a Pokemon are looked up too
+        :param fields: FieldProjection/String/None, e.g. "name,types,moves.power", None for everything
+        :return: PokedexObject, raises the exception the lookup failed with
+        """
+        results = await self.get_many(mode, [query], expanded, fields)
+        if isinstance(results[0], FailedRequest):
+            raise results[0].error
+        return results[0]
+
+    async def get_pokemon(self, query, expanded=False, fields=None):
+        """
+        Looks up a single Pokemon.
+
+        :param query: String/Integer, name or id
+        :param expanded: bool, whether its stats, abilities and moves are looked up too
+        :param fields: FieldProjection/String/None, fields to fetch and keep, None for everything
+        :return: Pokemon
+        """
+        return await self.get(POKEMON, str(query), expanded, fields)
+
+    async def get_move(self, query):
+        """
+        Looks up a single move.
+
+        :param query: String/Integer, name or id
+        :return: Move
+        """
+        return await self.get(MOVE, str(query))
+
+    async def get_ability(self, query):
+        """
+        Looks up a single ability.
+
+        :param query: String/Integer, name or id
+        :return: Ability
+        """
+        return await self.get(ABILITY, str(query))
+
+    async def get_many(self, mode, queries, expanded=False, fields=None):
+        """
+        Looks up a batch of queries concurrently.
+
+        :param mode: String, pokemon, ability, move or mixed
+        :param queries: iterable of strings
+        :param expanded: bool, whether the stats, abilities and moves of Pokemon are looked up too
+        :param fields: FieldProjection/String/None, fields to fetch and keep, None for everything
+        :return: list of PokedexObject or FailedRequest, in the order of queries
+        """
+        queries = list(queries)
+        results = [None] * len(queries)
+        async for index, pokedex_object in self.iter_results(mode, queries, expanded, fields):
+            results[index] = pokedex_object
+        return results
+
+    async def iter_results(self, mode, queries, expanded=False, fields=None, completed=frozenset()):
+        """
+        Looks up queries, which may be a lazy iterable, and yields the results as they complete. At most
+        queue_size of the scheduler config are looked up at once.
+
+        :param mode: String, pokemon, ability, move or mixed
+        :param queries: iterable of strings
+        :param expanded: bool, whether the stats, abilities and moves of Pokemon are looked up too
+        :param fields: FieldProjection/String/None, fields to fetch and keep, None for everything
+        :param completed: set of indexes in queries to skip
+        :return: async generator of (index in queries, PokedexObject or FailedRequest) tuples
+        """
+        from pokeretriever.pokemon_facade import PokeFacade
+        if isinstance(fields, str):
+            fields = FieldProjection.parse(fields)
+        request = Request(_parse_mode(mode), None, None, expanded, None, self._use_index, fields, self._plan)
+        if request.search_mode not in (POKEMON, ABILITY, MOVE, MIXED):
+            raise ValueError(f"Can't look up queries in {mode} mode")
+        queue_size = max(1, self._scheduler_config.queue_size)
+        results = PokeFacade.execute_inputs(request, queries, self._session, queue_size, self._name_indexes, completed)
+        try:
+            async for index, pokedex_object in results:
+                yield index, pokedex_object
+        finally:
+            await results.aclose()
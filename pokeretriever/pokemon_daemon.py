@@ -0,0 +1,224 @@
+"""
+This module contains PokedexDaemon class, the long-running local HTTP service that keeps a warm PokemonSession, and
+DaemonClient class, the thin client driver.py forwards lookups to when a daemon is running.
+"""
+import http.client
+import json
+import os
+import socket
+from pokeretriever.pokemon_requests import Request, DaemonConfig, FieldProjection
+from pokeretriever.pokemon_serializers import to_record, RenderedResult
+
+
+class DaemonRunningError(RuntimeError):
+    """
+    DaemonRunningError is a custom Exception class raised when another daemon already listens on the socket.
+    """
+    pass
+
+
+class PokedexDaemon:
+    """
+    PokedexDaemon represents the local HTTP service. The PokemonSession with its connection pool, response cache and
+    object memo stays open for the life of the daemon and the NameIndex of each mode is loaded once, so repeated
+    lookups are answered from memory and the response cache.
+
+    Endpoints: GET /health, GET /lookup/{mode}/{query}?expanded=1 and POST /batch with a JSON body
+    {"mode": ..., "queries": [...], "expanded": bool, "fields": "name,types", "plan": bool, "use_index": bool},
+    of which fields, plan and use_index are optional.
+    """
+    def __init__(self, session, config: DaemonConfig = None, queue_size=100):
+        self._session = session
+        self._config = config or DaemonConfig()
+        self._queue_size = queue_size
+        self._name_indexes = {}
+
+    async def lookup_many(self, mode, queries, expanded, fields=None, plan=False, use_index=True):
+        """
+        Looks up queries.
+
+        :param mode: String, search mode
+        :param queries: list of strings
+        :param expanded: bool
+        :param fields: String/None, comma separated fields to fetch and keep, None for everything
+        :param plan: bool, whether expanded lookups go through a BatchPlanner
+        :param use_index: bool, whether queries are validated against the name index
+        :return: list of dicts with text and record, in the order of queries
+        """
+        from pokeretriever.pokemon_facade import PokeFacade
+        from pokeretriever.cli_parser import _parse_mode
+        projection = FieldProjection.parse(fields)
+        request = Request(_parse_mode(mode), None, None, expanded, None, use_index, projection, plan)
+        results = [None] * len(queries)
+        pending = PokeFacade.execute_inputs(request, queries, self._session, self._queue_size,
+                                            self._name_indexes if use_index else {})
+        async for index, pokedex_object in pending:
+            results[index] = {'text': str(pokedex_object), 'record': to_record(pokedex_object)}
+        return results
+
+    def make_app(self):
+        """
+        Makes the aiohttp application of the daemon.
+
+        :return: aiohttp.web.Application
+        """
+        from aiohttp import web
+
+        async def health(request):
+            return web.json_response({'ok': True, 'pid': os.getpid()})
+
+        async def lookup(request):
+            expanded = request.query.get('expanded', '') in ('1', 'true')
+            results = await self.lookup_many(request.match_info['mode'], [request.match_info['query']], expanded)
+            return web.json_response(results[0])
+
+        async def batch(request):
+            body = await request.json()
+            results = await self.lookup_many(body['mode'], body['queries'], bool(body.get('expanded')),
+                                             body.get('fields'), bool(body.get('plan')),
+                                             bool(body.get('use_index', True)))
+            return web.json_response({'results': results})
+
+        app = web.Application()
+        app.router.add_get('/health', health)
+        app.router.add_get('/lookup/{mode}/{query}', lookup)
+        app.router.add_post('/batch', batch)
+        return app
+
+    def _remove_stale_socket(self):
+        """
+        Removes the socket file a daemon that is no longer running left behind.
+
+        :return: None, raises DaemonRunningError if a daemon still accepts connections on it
+        """
+        path = self._config.socket_path
+        if not os.path.exists(path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+        finally:
+            probe.close()
+        raise DaemonRunningError(f"A daemon is already serving on {path}")
+
+    async def serve_forever(self):
+        """
+        Serves on the Unix socket, or on host and port if no socket path is configured, until cancelled.
+
+        :return: None, raises DaemonRunningError if another daemon listens on the socket
+        """
+        import asyncio
+        from aiohttp import web
+        runner = web.AppRunner(self.make_app(), access_log=None)
+        await runner.setup()
+        if self._config.socket_path:
+            self._remove_stale_socket()
+            site = web.UnixSite(runner, self._config.socket_path)
+            address = self._config.socket_path
+        else:
+            site = web.TCPSite(runner, self._config.host, self._config.port)
+            address = f"http://{self._config.host}:{self._config.port}"
+        await site.start()
+        print(f"Serving lookups on {address}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+            if self._config.socket_path and os.path.exists(self._config.socket_path):
+                os.unlink(self._config.socket_path)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    _UnixHTTPConnection is an HTTPConnection that talks to a Unix domain socket.
+    """
+
+    def __init__(self, socket_path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+class DaemonClient:
+    """
+    DaemonClient represents the thin, standard library only client of a running PokedexDaemon.
+    """
+    PROBE_TIMEOUT = 0.5
+    BATCH_SIZE = 500
+
+    def __init__(self, config: DaemonConfig = None, timeout=300.0):
+        self._config = config or DaemonConfig()
+        self._timeout = timeout
+
+    def _connect(self, timeout):
+        if self._config.socket_path:
+            return _UnixHTTPConnection(self._config.socket_path, timeout)
+        return http.client.HTTPConnection(self._config.host, self._config.port, timeout=timeout)
+
+    def _request(self, method, path, body=None, timeout=None):
+        connection = self._connect(timeout or self._timeout)
+        try:
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+            if response.status != 200:
+                raise ConnectionError(f"Daemon answered {response.status}: {payload[:200]!r}")
+            return json.loads(payload)
+        finally:
+            connection.close()
+
+    def is_running(self):
+        """
+        Checks whether a daemon answers at the configured address.
+
+        :return: bool
+        """
+        if self._config.socket_path and not os.path.exists(self._config.socket_path):
+            return False
+        try:
+            return bool(self._request('GET', '/health', timeout=self.PROBE_TIMEOUT).get('ok'))
+        except (OSError, ValueError):
+            return False
+
+    def lookup_many(self, mode, queries, expanded, completed=frozenset(), fields: FieldProjection = None,
+                    plan=False, use_index=True):
+        """
+        Looks up queries on the daemon in batches.
+
+        :param mode: String, search mode
+        :param queries: iterable of strings
+        :param expanded: bool
+        :param completed: set of indexes in queries done by an earlier run, skipped
+        :param fields: FieldProjection/None, fields to fetch and keep, None for everything
+        :param plan: bool, whether expanded lookups go through a BatchPlanner
+        :param use_index: bool, whether queries are validated against the name index
+        :return: generator of (index, RenderedResult) tuples in input order
+        """
+        options = {'expanded': expanded, 'fields': fields.to_text() if fields is not None else None, 'plan': plan,
+                   'use_index': use_index}
+        indexes = []
+        batch = []
+        for index, query in enumerate(queries):
+            if index in completed:
+                continue
+            indexes.append(index)
+            batch.append(query)
+            if len(batch) >= self.BATCH_SIZE:
+                yield from self._lookup_batch(mode, batch, options, indexes)
+                indexes = []
+                batch = []
+        if batch:
+            yield from self._lookup_batch(mode, batch, options, indexes)
+
+    def _lookup_batch(self, mode, batch, options, indexes):
+        response = self._request('POST', '/batch', {'mode': mode, 'queries': batch, **options})
+        for index, result in zip(indexes, response['results']):
+            yield index, RenderedResult(result['text'], result['record'])
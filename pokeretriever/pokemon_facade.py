@@ -0,0 +1,270 @@
+"""
+This module contains PokeFacade class that helps to execute requests under the hood.
+"""
+import asyncio
+import collections
+import dataclasses
+import sys
+from pokeretriever.cli_parser import POKEMON, MIXED, InvalidModeException
+from pokeretriever.pokemon_requests import Request, Modes, SessionConfig, CacheConfig, SchedulerConfig
+from pokeretriever.pokemon_parser import PokemonParser, FailedRequest
+from pokeretriever.pokemon_index import InvalidQueryException, load_name_index
+from pokeretriever.pokemon_session import PokemonSession
+from pokeretriever.pokemon_input import iter_inputs, count_inputs, parse_query
+
+
+class PokeFacade:
+    """
+    PokeFacade represents the facade pattern where heavy duty operations are carried out under the hood.
+    """
+    SHARD_SIZE = 200
+
+    @staticmethod
+    async def __indexed(index, parse_task):
+        return index, await parse_task
+
+    @staticmethod
+    async def load_name_indexes(request, session: PokemonSession) -> dict:
+        """
+        Loads the NameIndex of the search mode, unless doing so would cost a request on every run.
+
+        :param request: Request object
+        :param session: PokemonSession shared by every task
+        :return: dict of search mode to NameIndex, empty if the index is unavailable
+        """
+        if not request.use_index or not (session.snapshot is not None or session.is_caching):
+            return {}
+        try:
+            mode = Modes(PokemonParser.SEARCH_MODE_MAPPER[request.search_mode])
+            return {request.search_mode: await load_name_index(session, mode)}
+        except Exception as e:
+            print(f"Name index unavailable, queries won't be validated: {e}", file=sys.stderr)
+            return {}
+
+    @staticmethod
+    async def __prepare(request, inputs, session: PokemonSession, name_indexes: dict, completed):
+        """
+        Works out the mode request and target url of every input, loading the NameIndex of each mode as it is
+        first seen. Inputs in an unknown mode, or that the NameIndex rejects, fail without making a request.
+
+        :return: async generator of (index in inputs, mode Request or FailedRequest, target url or None) tuples
+        """
+        default_mode = POKEMON if request.search_mode == MIXED else request.search_mode
+        mode_requests = {}
+        pokemon_parser = PokemonParser(name_indexes)
+        for index, content in enumerate(inputs):
+            if index in completed:
+                continue
+            mode, query = parse_query(content, default_mode)
+            mode_request = mode_requests.get(mode)
+            if mode_request is None:
+                if mode not in PokemonParser.SEARCH_MODE_MAPPER:
+                    yield index, FailedRequest(content, InvalidModeException(f"Unknown mode '{mode}'")), None
+                    continue
+                mode_request = mode_requests[mode] = dataclasses.replace(request, search_mode=mode)
+                if mode not in name_indexes:
+                    name_indexes.update(await PokeFacade.load_name_indexes(mode_request, session))
+                    name_indexes.setdefault(mode, None)
+            try:
+                yield index, mode_request, pokemon_parser.make_target_url(mode, query)
+            except InvalidQueryException as e:
+                yield index, FailedRequest(content, e), None
+
+    @staticmethod
+    async def execute_inputs(request, inputs, session: PokemonSession, queue_size: int = 100,
+                             name_indexes: dict = None, completed=frozenset()):
+        """
+        Executes the requests, keeping at most queue_size of them in flight, and yields them as they complete.
+        Every input may name its own mode (see parse_query), so one run can mix Pokemon, moves and abilities.
+        Queries the NameIndex rejects are yielded straight away as FailedRequest without making a request.
+        Planned expanded requests go through execute_planned instead.
+
+        :param request: Request object
+        :param inputs: iterable of names or ids to retrieve
+        :param session: PokemonSession shared by every task
+        :param queue_size: Integer, maximum number of requests in flight
+        :param name_indexes: dict of search mode to NameIndex (or None once known to be unavailable), filled in
+                             as modes are first seen so it can be reused across calls
+        :param completed: set of indexes in inputs done by an earlier run, skipped
+        :return: async generator of (index in inputs, PokedexObject) tuples
+        """
+        if name_indexes is None:
+            name_indexes = {}
+        if request.plan and (request.is_expanded or (request.fields is not None and request.fields.sub_fields)):
+            results = PokeFacade.execute_planned(request, inputs, session, queue_size, name_indexes, completed)
+        else:
+            results = PokeFacade.__execute_unplanned(request, inputs, session, queue_size, name_indexes, completed)
+        try:
+            async for result in results:
+                yield result
+        finally:
+            await results.aclose()
+
+    @staticmethod
+    async def __execute_unplanned(request, inputs, session: PokemonSession, queue_size, name_indexes, completed):
+        pokemon_parser = PokemonParser(name_indexes)
+        pending = set()
+        try:
+            async for index, mode_request, target_url in PokeFacade.__prepare(request, inputs, session,
+                                                                               name_indexes, completed):
+                if isinstance(mode_request, FailedRequest):
+                    yield index, mode_request
+                    continue
+                parse_task = pokemon_parser.pokemon_data_request(mode_request, target_url, session)
+                pending.add(asyncio.ensure_future(PokeFacade.__indexed(index, parse_task)))
+                if len(pending) >= queue_size:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def execute_planned(request, inputs, session: PokemonSession, batch_size: int = 100,
+                              name_indexes: dict = None, completed=frozenset()):
+        """
+        Executes the requests in batches of batch_size in two phases: every top-level resource of the batch is
+        fetched first, then a BatchPlanner fetches the union of their sub-resources once each and expands the
+        Pokemon from it. The results of a batch are yielded in input order once the whole batch is done.
+
+        :param request: Request object
+        :param inputs: iterable of names or ids to retrieve
+        :param session: PokemonSession shared by every task
+        :param batch_size: Integer, number of requests planned together
+        :param name_indexes: dict of search mode to NameIndex, see execute_inputs
+        :param completed: set of indexes in inputs done by an earlier run, skipped
+        :return: async generator of (index in inputs, PokedexObject) tuples
+        """
+        from pokeretriever.pokemon_planner import BatchPlanner
+        if name_indexes is None:
+            name_indexes = {}
+        pokemon_parser = PokemonParser(name_indexes)
+        planner = BatchPlanner(session)
+
+        async def run_batch(batch):
+            with session.stats.timer("plan.top_level"):
+                fetched = await asyncio.gather(*[pokemon_parser.pokemon_data_request(mode_request, target_url,
+                                                                                     session, expand=False)
+                                                 for _, mode_request, target_url in batch])
+            expanded = await planner.expand([(target_url, pokedex_object)
+                                             for (_, _, target_url), pokedex_object in zip(batch, fetched)])
+            return [(index, pokedex_object) for (index, _, _), pokedex_object in zip(batch, expanded)]
+
+        batch = []
+        async for index, mode_request, target_url in PokeFacade.__prepare(request, inputs, session, name_indexes,
+                                                                           completed):
+            if isinstance(mode_request, FailedRequest):
+                yield index, mode_request
+                continue
+            batch.append((index, mode_request, target_url))
+            if len(batch) >= batch_size:
+                for result in await run_batch(batch):
+                    yield result
+                batch = []
+        if batch:
+            for result in await run_batch(batch):
+                yield result
+
+    @staticmethod
+    def read_inputs(request: Request):
+        """
+        Gets the queries of request, its single input data or the lazily read lines of its input file.
+
+        :param request: Request object
+        :return: tuple (iterable of strings, number of queries or None if unknown)
+        """
+        is_single_item = request.input_data and not request.input_file
+
+        if is_single_item:
+            return [request.input_data], 1
+        return iter_inputs(request.input_file), count_inputs(request.input_file)
+
+    @staticmethod
+    def execute_request(request: Request, session: PokemonSession, queue_size: int = 100, completed=frozenset()):
+        """
+        Executes request using the Request object to query for Pokemon, Ability, or Move.
+
+        :param request: Request object
+        :param session: PokemonSession shared by every request of the run
+        :param queue_size: Integer, maximum number of requests in flight
+        :param completed: set of input indexes done by an earlier run, skipped
+        :return: tuple (async generator of (index, PokedexObject), number of requests or None if unknown)
+        """
+        inputs, length = PokeFacade.read_inputs(request)
+        return PokeFacade.execute_inputs(request, inputs, session, max(1, queue_size),
+                                         completed=completed), length
+
+    @staticmethod
+    async def execute_shards(request, inputs, session_config: SessionConfig, cache_config: CacheConfig,
+                             scheduler_config: SchedulerConfig, completed=frozenset()):
+        """
+        Executes the requests across scheduler_config.workers processes, each with its own event loop and session
+        but sharing the on-disk cache. The input is cut into shards handed to whichever worker is free, and the
+        results of the shards are yielded in input order, so at most two shards per worker are ever held back.
+        The rate and concurrency limits are split evenly between the workers.
+
+        :param request: Request object
+        :param inputs: iterable of names or ids to retrieve
+        :param session_config: SessionConfig every worker opens its session with
+        :param cache_config: CacheConfig of the shared response cache
+        :param scheduler_config: SchedulerConfig of the whole run
+        :param completed: set of indexes in inputs done by an earlier run, skipped
+        :return: async generator of (index in inputs, RenderedResult) tuples
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from pokeretriever.pokemon_workers import init_worker, run_shard
+        workers = scheduler_config.workers
+        worker_config = dataclasses.replace(scheduler_config,
+                                            concurrency=max(1, scheduler_config.concurrency // workers),
+                                            rate=scheduler_config.rate / workers,
+                                            burst=scheduler_config.burst / workers)
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'), initializer=init_worker,
+                                   initargs=(session_config, cache_config, worker_config))
+        pending = collections.deque()
+        shard = []
+        try:
+            for index, content in enumerate(inputs):
+                if index in completed:
+                    continue
+                shard.append((index, content))
+                if len(shard) < PokeFacade.SHARD_SIZE:
+                    continue
+                pending.append(loop.run_in_executor(pool, run_shard, request, shard, scheduler_config.queue_size))
+                shard = []
+                if len(pending) >= 2 * workers:
+                    for result in sorted(await pending.popleft(), key=lambda result: result[0]):
+                        yield result
+            if shard:
+                pending.append(loop.run_in_executor(pool, run_shard, request, shard, scheduler_config.queue_size))
+            while pending:
+                for result in sorted(await pending.popleft(), key=lambda result: result[0]):
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def execute_sharded(request: Request, session_config: SessionConfig, cache_config: CacheConfig,
+                        scheduler_config: SchedulerConfig, completed=frozenset()):
+        """
+        Executes the requests of the input file of request across worker processes, see execute_shards.
+
+        :param request: Request object
+        :param session_config: SessionConfig every worker opens its session with
+        :param cache_config: CacheConfig of the shared response cache
+        :param scheduler_config: SchedulerConfig of the whole run
+        :param completed: set of input indexes done by an earlier run, skipped
+        :return: tuple (async generator of (index, RenderedResult), number of requests or None if unknown)
+        """
+        PokemonSession.check_snapshot(session_config)
+        inputs, length = PokeFacade.read_inputs(request)
+        return PokeFacade.execute_shards(request, inputs, session_config, cache_config, scheduler_config,
+                                         completed), length
@@ -0,0 +1,153 @@
+"""
+This module contains the output formats the OutputWriter can stream results in: text, JSON Lines, CSV and columnar.
+"""
+import abc
+import csv
+import datetime
+import time
+from pokeretriever import pokemon_json
+from pokeretriever.pokemon_requests import FieldProjection
+from pokeretriever.pokemon_serializers import to_record, project_schema, SCHEMA_MAPPER, FailedRequestSerializer
+
+TEXT = 'text'
+JSONL = 'jsonl'
+CSV = 'csv'
+COLUMNAR = 'columnar'
+
+
+class OutputFormat(abc.ABC):
+    """
+    OutputFormat represents how results are laid out in the output. HEADER_ON_SCREEN tells whether the header is
+    also written when results go to the screen instead of a file. Records only carry the fields of the projection.
+    """
+    HEADER_ON_SCREEN = False
+
+    def __init__(self, search_mode, projection: FieldProjection = None):
+        self._search_mode = search_mode
+        self._projection = projection
+
+    def write_header(self, file, num_of_requests):
+        """
+        Writes the header of a new or empty output.
+
+        :param file: text stream
+        :param num_of_requests: Integer/None, number of requests or None if unknown
+        :return: None
+        """
+        pass
+
+    @abc.abstractmethod
+    def write(self, file, pokedex_object):
+        pass
+
+    def drain(self, file):
+        """
+        Writes the records the format holds on to so far, called before every journal commit.
+
+        :param file: text stream
+        :return: None
+        """
+        pass
+
+    def close(self, file):
+        """
+        Writes whatever the format still holds on to.
+
+        :param file: text stream
+        :return: None
+        """
+        self.drain(file)
+
+
+class TextFormat(OutputFormat):
+    """
+    TextFormat represents the human readable output made of the str of every PokedexObject.
+    """
+
+    def write_header(self, file, num_of_requests):
+        file.write(f"Timestamp: {datetime.datetime.fromtimestamp(time.time()).strftime('%d/%m/%Y %H:%M')}\n")
+        if num_of_requests is not None:
+            file.write(f"Number of requests: {num_of_requests}\n")
+        file.write("\n")
+
+    def write(self, file, pokedex_object):
+        file.write(f"{str(pokedex_object)}\n")
+
+
+class JsonLinesFormat(OutputFormat):
+    """
+    JsonLinesFormat represents the output of one JSON record per line.
+    """
+
+    def write(self, file, pokedex_object):
+        file.write(pokemon_json.dumps(to_record(pokedex_object, self._projection)))
+        file.write("\n")
+
+
+class CsvFormat(OutputFormat):
+    """
+    CsvFormat represents the output of one CSV row per record, using the schema of the search mode followed by an
+    error column. Nested fields are JSON encoded.
+    """
+    HEADER_ON_SCREEN = True
+
+    def __init__(self, search_mode, projection: FieldProjection = None):
+        super().__init__(search_mode, projection)
+        self._fields = project_schema(SCHEMA_MAPPER[search_mode], projection) + ('error',)
+
+    def write_header(self, file, num_of_requests):
+        csv.writer(file).writerow(self._fields)
+
+    def write(self, file, pokedex_object):
+        record = to_record(pokedex_object, self._projection)
+        if record['kind'] == FailedRequestSerializer.KIND:
+            record = {'kind': record['kind'], 'name': record['input'], 'error': record['error']}
+        csv.writer(file).writerow([self._encode(record.get(field)) for field in self._fields])
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, (list, dict)):
+            return pokemon_json.dumps(value)
+        return '' if value is None else value
+
+
+class ColumnarFormat(OutputFormat):
+    """
+    ColumnarFormat represents a Parquet-style output where records are grouped per kind into row groups and each
+    row group is written as one JSON line holding a list of values per column. A journaled output drains its row
+    groups at every flush, so they hold at most flush_every rows.
+    """
+    ROW_GROUP_SIZE = 1000
+
+    def __init__(self, search_mode, projection: FieldProjection = None):
+        super().__init__(search_mode, projection)
+        self._groups = {}
+
+    def write(self, file, pokedex_object):
+        record = to_record(pokedex_object, self._projection)
+        kind = record['kind']
+        group = self._groups.get(kind)
+        if group is None:
+            group = self._groups[kind] = {field: [] for field in record}
+        for field, column in group.items():
+            column.append(record[field])
+        if len(group['kind']) >= self.ROW_GROUP_SIZE:
+            self._write_group(file, kind)
+
+    def _write_group(self, file, kind):
+        group = self._groups.pop(kind)
+        columns = {field: column for field, column in group.items() if field != 'kind'}
+        file.write(pokemon_json.dumps({'kind': kind, 'num_rows': len(group['kind']), 'columns': columns}))
+        file.write("\n")
+
+    def drain(self, file):
+        for kind in list(self._groups):
+            self._write_group(file, kind)
+
+
+FORMAT_MAPPER = {
+    TEXT: TextFormat,
+    JSONL: JsonLinesFormat,
+    CSV: CsvFormat,
+    COLUMNAR: ColumnarFormat,
+}
@@ -0,0 +1,127 @@
+"""
+This module contains NameIndex class that validates, normalises and fuzzy-matches queries before any request is made.
+"""
+import bisect
+import difflib
+from collections import defaultdict
+from pokeretriever.pokemon_requests import Modes
+from pokeretriever.pokemon_snapshot import list_resources, SnapshotStore
+
+
+class InvalidQueryException(Exception):
+    """
+    InvalidQueryException is a custom Exception class raised when a query is neither a known name nor a known id.
+    """
+    pass
+
+
+class NameIndex:
+    """
+    NameIndex represents the in-memory name to id and id to name maps of a resource type, with a sorted name list
+    for prefix lookups and a trigram index for fuzzy "did you mean" suggestions.
+    """
+    MAX_SUGGESTIONS = 3
+    MIN_SIMILARITY = 0.6
+
+    def __init__(self, kind, entries):
+        self._kind = kind
+        self._name_to_id = {}
+        self._id_to_name = {}
+        self._trigrams = defaultdict(set)
+        for resource_id, name in entries:
+            self._name_to_id[name] = resource_id
+            self._id_to_name[resource_id] = name
+            for trigram in self._make_trigrams(name):
+                self._trigrams[trigram].add(name)
+        self._sorted_names = sorted(self._name_to_id)
+
+    def __len__(self):
+        return len(self._name_to_id)
+
+    @staticmethod
+    def normalise(content):
+        """
+        Normalises a raw query the way PokeAPI spells names: lower case with dashes instead of spaces.
+
+        :param content: String, raw name or id
+        :return: String
+        """
+        content = "-".join(content.strip().lower().replace("_", " ").split())
+        return str(int(content)) if content.isdigit() else content
+
+    @staticmethod
+    def _make_trigrams(name):
+        padded = f"  {name} "
+        return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+    def resolve(self, content):
+        """
+        Resolves a raw query to the id of the resource it names.
+
+        :param content: String, raw name or id
+        :return: Integer, id of the resource
+        """
+        key = self.normalise(content)
+        if key.isdigit() and int(key) in self._id_to_name:
+            return int(key)
+        if key in self._name_to_id:
+            return self._name_to_id[key]
+        suggestions = self.suggest(key)
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+        raise InvalidQueryException(f"'{content.strip()}' is not a valid {self._kind}.{hint}")
+
+    def name_of(self, resource_id):
+        return self._id_to_name.get(resource_id)
+
+    def id_of(self, name):
+        return self._name_to_id.get(self.normalise(name))
+
+    def with_prefix(self, prefix):
+        """
+        Gets every name starting with prefix.
+
+        :param prefix: String
+        :return: list of strings
+        """
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        end = bisect.bisect_left(self._sorted_names, prefix + "￿")
+        return self._sorted_names[start:end]
+
+    def suggest(self, key):
+        """
+        Gets the names closest to a normalised query that isn't in the index.
+
+        :param key: String, normalised query
+        :return: list of strings, best match first
+        """
+        if not key or key.isdigit():
+            return []
+        candidates = set()
+        for trigram in self._make_trigrams(key):
+            candidates.update(self._trigrams.get(trigram, ()))
+        scored = sorted(((difflib.SequenceMatcher(None, key, name).ratio(), name) for name in candidates),
+                        reverse=True)
+        suggestions = [name for score, name in scored if score >= self.MIN_SIMILARITY]
+        for name in self.with_prefix(key):
+            if name not in suggestions:
+                suggestions.append(name)
+        return suggestions[:self.MAX_SUGGESTIONS]
+
+
+def _id_from_url(url):
+    return int(SnapshotStore.parse_url(url)[1])
+
+
+async def load_name_index(session, mode: Modes):
+    """
+    Builds the NameIndex of a resource type from the snapshot in offline mode, otherwise from the list endpoint.
+
+    :param session: PokemonSession
+    :param mode: Modes member of the resource type
+    :return: NameIndex
+    """
+    kind = SnapshotStore.parse_url(mode.value + "/")[0]
+    if session.snapshot is not None:
+        return NameIndex(kind, session.snapshot.iter_names(kind))
+    results = await list_resources(session, mode)
+    return NameIndex(kind, ((_id_from_url(result['url']), result['name']) for result in results))
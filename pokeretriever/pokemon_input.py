@@ -0,0 +1,84 @@
+"""
+This module contains the functions that lazily read queries from an input file, a gzip-compressed file or stdin, and
+split mixed batch queries into their mode and name or id.
+"""
+import gzip
+import io
+import json
+import sys
+from pokeretriever.cli_parser import POKEMON, ABILITY, MOVE
+from pokeretriever.pokemon_cache import ObjectMemo
+
+STDIN = '-'
+GZIP_MAGIC = b'\x1f\x8b'
+QUERY_MODES = (POKEMON, ABILITY, MOVE)
+MODE_SEPARATOR = ':'
+SEEN_WINDOW = 65536
+
+
+def open_input(input_file):
+    """
+    Opens the input file as text, transparently decompressing it if it is gzip-compressed.
+
+    :param input_file: String, filepath or '-' for stdin
+    :return: text stream
+    """
+    raw = sys.stdin.buffer if input_file == STDIN else open(input_file, mode='rb')
+    if not hasattr(raw, 'peek'):
+        raw = io.BufferedReader(raw)
+    if raw.peek(len(GZIP_MAGIC))[:len(GZIP_MAGIC)] == GZIP_MAGIC:
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding='utf-8')
+
+
+def iter_inputs(input_file):
+    """
+    Yields the queries of the input file one at a time, skipping blank lines and queries repeated within the last
+    SEEN_WINDOW distinct queries, so memory stays flat however long the input is.
+
+    :param input_file: String, filepath or '-' for stdin
+    :return: generator of strings
+    """
+    seen = ObjectMemo(SEEN_WINDOW)
+    with open_input(input_file) as file:
+        for line in file:
+            content = line.strip()
+            key = content.lower()
+            if not content or seen.get(key):
+                continue
+            seen.put(key, True)
+            yield content
+
+
+def count_inputs(input_file):
+    """
+    Counts the queries of the input file in one streaming pass without keeping them in memory.
+
+    :param input_file: String, filepath or '-' for stdin
+    :return: Integer/None, None for stdin which can only be read once
+    """
+    if input_file == STDIN:
+        return None
+    return sum(1 for _ in iter_inputs(input_file))
+
+
+def parse_query(content, default_mode):
+    """
+    Splits a query into its mode and name or id. A query is either a JSON object with a mode and a query (or name
+    or id), a "mode:name" pair such as move:tackle, or a plain name or id searched for in default_mode.
+
+    :param content: String, stripped line of the input
+    :param default_mode: String, mode of plain queries
+    :return: tuple (mode:str, query:str)
+    """
+    if content.startswith('{'):
+        try:
+            record = json.loads(content)
+        except ValueError:
+            return default_mode, content
+        query = record.get('query', record.get('name', record.get('id', '')))
+        return str(record.get('mode', default_mode)).strip().lower(), str(query)
+    mode, separator, query = content.partition(MODE_SEPARATOR)
+    if separator and mode.strip().lower() in QUERY_MODES:
+        return mode.strip().lower(), query.strip()
+    return default_mode, content
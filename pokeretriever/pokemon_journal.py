@@ -0,0 +1,93 @@
+"""
+This module contains the Journal class that checkpoints which results of a batch have made it into the output file.
+"""
+import os
+
+
+class Journal:
+    """
+    Journal represents the checkpoint file kept next to an output file. Every line is one commit: the size of the
+    output once the records of the commit were safely on disk, followed by the input indexes of those records.
+    Resuming truncates the output back to the last committed size, which drops a half-written record left by a
+    crash, and skips the inputs already done. A torn last line of the journal itself is ignored.
+    """
+    SUFFIX = '.journal'
+
+    def __init__(self, output, resume=False):
+        self._output = output
+        self._path = output + self.SUFFIX
+        self.completed = set()
+        self.committed_offset = None
+        self._uncommitted = []
+        valid_size = self._load() if resume else 0
+        self._file = open(self._path, mode='r+b' if resume and os.path.exists(self._path) else 'wb')
+        self._file.truncate(valid_size)
+        self._file.seek(valid_size)
+
+    def _load(self):
+        """
+        Reads the commits of a previous run.
+
+        :return: Integer, size of the journal up to its last complete line
+        """
+        if not os.path.exists(self._path):
+            return 0
+        valid_size = 0
+        with open(self._path, mode='rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                offset, *indexes = line.split()
+                self.committed_offset = int(offset)
+                self.completed.update(map(int, indexes))
+                valid_size += len(line)
+        return valid_size
+
+    def truncate_output(self):
+        """
+        Cuts the output file back to the last committed size so it ends with a whole record.
+
+        :return: None
+        """
+        if self.committed_offset is not None and os.path.exists(self._output):
+            os.truncate(self._output, self.committed_offset)
+
+    def add(self, index):
+        """
+        Records that the result of the input at index has been written, it is committed by the next commit.
+
+        :param index: Integer, position of the request in the input
+        :return: None
+        """
+        self._uncommitted.append(index)
+
+    def commit(self, offset):
+        """
+        Commits every record added since the last commit. The output must already be on disk up to offset.
+
+        :param offset: Integer, size of the output file
+        :return: None
+        """
+        line = ' '.join(map(str, [offset, *self._uncommitted]))
+        self._file.write(f"{line}\n".encode('ascii'))
+        self._file.flush()
+        self.completed.update(self._uncommitted)
+        self.committed_offset = offset
+        self._uncommitted = []
+
+    def close(self):
+        """
+        Closes the journal file.
+
+        :return: None
+        """
+        self._file.close()
+
+    def remove(self):
+        """
+        Closes and deletes the journal file once the run it checkpoints has finished.
+
+        :return: None
+        """
+        self._file.close()
+        os.remove(self._path)
@@ -0,0 +1,61 @@
+"""
+This module contains the JSON helpers shared by the session and the output formats. Decoding uses orjson or
+simdjson when one of them is installed, encoding uses orjson when it is installed, both fall back to the stdlib.
+"""
+import json
+from pokeretriever.pokemon_requests import AUTO, ORJSON, SIMDJSON, STDLIB
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+
+def dumps(value) -> str:
+    """
+    Encodes value as compact JSON.
+
+    :param value: json serialisable value
+    :return: String
+    """
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def dump_bytes(value) -> bytes:
+    """
+    Encodes value as compact UTF-8 JSON.
+
+    :param value: json serialisable value
+    :return: bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def get_decoder(name=AUTO):
+    """
+    Gets the function that decodes JSON bytes with the named library, or the fastest installed one for auto.
+
+    :param name: String, one of DECODERS
+    :return: callable taking bytes and returning json, raises ImportError if the library isn't installed
+    """
+    if name == AUTO:
+        name = ORJSON if orjson is not None else SIMDJSON if simdjson is not None else STDLIB
+    if name == ORJSON:
+        if orjson is None:
+            raise ImportError("The orjson decoder needs orjson, pip install orjson")
+        return orjson.loads
+    if name == SIMDJSON:
+        if simdjson is None:
+            raise ImportError("The simdjson decoder needs pysimdjson, pip install pysimdjson")
+        parser = simdjson.Parser()
+        return lambda body: parser.parse(body, True)
+    return json.loads
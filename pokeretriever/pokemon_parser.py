@@ -1,12 +1,29 @@
 """
 This module contains PokemonParser class that helps with returning PokedexObject for PokeFacade class.
 """
-import aiohttp
 from pokeretriever.PokedexEngine import PokemonFactory, AbilityFactory, MoveFactory
 from pokeretriever.pokemon_requests import Modes
-import datetime
-import time
-import os
+from pokeretriever.pokemon_session import PokemonSession
+
+
+class FailedRequest:
+    """
+    FailedRequest represents the result of a request that could not be turned into a PokedexObject.
+    """
+
+    def __init__(self, target_url, error):
+        self._target_url = target_url
+        self._error = error
+
+    @property
+    def error(self):
+        """
+        Exception the request failed with.
+        """
+        return self._error
+
+    def __str__(self):
+        return f"An error has occurred. Skipping this request: {self._error}\n"
 
 
 class PokemonParser:
@@ -25,55 +42,44 @@ class PokemonParser:
         "move": MoveFactory()
     }
 
+    def __init__(self, name_indexes: dict = None):
+        self._name_indexes = name_indexes if name_indexes is not None else {}
+
     def make_target_url(self, search_mode, content):
         """
-        Makes target url from search mode and content.
+        Makes target url from search mode and content. When a NameIndex of the search mode is loaded the query is
+        validated and the url is made from its id, raising InvalidQueryException with suggestions if it is unknown.
 
         :param search_mode: String, Search mode in Request: pokemon, move, or ability
         :param content: String, name or id of query
         :return: String, target url to be used for API GET request.
         """
+        name_index = self._name_indexes.get(search_mode)
+        if name_index is not None:
+            return f"{self.SEARCH_MODE_MAPPER[search_mode]}/{name_index.resolve(content)}"
         return f"{self.SEARCH_MODE_MAPPER[search_mode]}/{content.strip()}"
 
-    async def pokemon_data_request(self, request, target_url):
+    async def pokemon_data_request(self, request, target_url, session: PokemonSession, expand=True):
         """Parse a single pokemon request.
 
         :param request: Request object
         :param target_url: String, target url to make API GET request
-        :return: PokedexObject class object
-        """
-        async with aiohttp.ClientSession() as session:
-            try:
-                response = await session.request("GET", url=target_url)
-                response_json = await response.json()
-
-                return self.FACTORY_MAPPER[request.search_mode].create_object(response_json, request)
-            except Exception as e:
-                if request.output:
-                    with open(request.output, mode="a", encoding='utf-8') as file:
-                        file.write(f"\nAn error has occurred. Skipping this request\n")
-                else:
-                    print(e)
-
-    @staticmethod
-    def write_pokedex_object_to_output_file(num_of_requests, pokedex_object, output):
-        """
-        Writes PokedexObject to output file.
-
-        :param num_of_requests: Integer, number of requests.
-        :param pokedex_object: PokedexObject class object
-        :param output: String, output filepath
-        :return: None
+        :param session: PokemonSession shared by the whole run
+        :param expand: bool, False to leave the expansion to a BatchPlanner
+        :return: PokedexObject class object, FailedRequest if anything went wrong
         """
+        stats = session.stats
         try:
-            if (not os.path.exists(output)) or os.stat(output).st_size == 0:
-                with open(output, mode="a", encoding='utf-8') as data_file:
-                    data_file.write(f"Timestamp: "
-                                    f"{datetime.datetime.fromtimestamp(time.time()).strftime('%d/%m/%Y %H:%M')}\n"
-                                    f"Number of requests: {num_of_requests}\n\n")
+            with stats.timer("pokemon_data_request"):
+                response_json = await session.get_json(target_url)
+
+                with stats.timer("create_object"):
+                    pokedex_object = await self.FACTORY_MAPPER[request.search_mode].create_object(response_json,
+                                                                                                  request, session)
+                if expand:
+                    with stats.timer("expand"):
+                        await pokedex_object.expand(session)
+                return pokedex_object
         except Exception as e:
-            print(e)
-        finally:
-            with open(output, mode="a", encoding='utf-8') as file:
-                file.write(f"{str(pokedex_object)}\n")
-            print("Printed, shipped, and finished!")
+            stats.count("failed_requests")
+            return FailedRequest(target_url, e)
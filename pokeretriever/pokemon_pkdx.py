@@ -0,0 +1,237 @@
+"""
+This module contains PkdxStore class, the compact binary Pokedex file that offline mode maps into memory instead of
+querying the SQLite snapshot, and the writer that builds it from a SnapshotStore.
+
+A .pkdx file is laid out as:
+
+    header       magic, version, number of resource types, offset of the string pool, offset of the bodies
+    directory    per resource type: its name, number of records, offset of its record table and name index
+    records      per resource type: fixed-width (id, name offset, name length, body offset, body length) records
+                 sorted by id
+    name index   per resource type: record numbers sorted by name
+    string pool  every name, UTF-8
+    bodies       every response body, compact JSON
+
+All integers are little-endian.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+from pokeretriever.pokemon_snapshot import SnapshotStore
+
+PKDX_SUFFIX = ".pkdx"
+
+
+class PkdxStore:
+    """
+    PkdxStore represents a read-only .pkdx file mapped with mmap. Opening it only reads the header and the
+    directory, so it takes the same time whatever the size of the Pokedex. Lookups binary search the record table
+    by id or the name index by name on the mapped pages and only then copy out the one body they need. The pages
+    are shared through the page cache by every process mapping the file, such as the workers of a sharded run. It
+    has the read methods of SnapshotStore, so the session, indexes and loaders use either.
+    """
+    MAGIC = b"PKDX"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHQQ")
+    DIRECTORY_ENTRY = struct.Struct("<16sIQQ")
+    RECORD = struct.Struct("<IIIQI")
+    NAME_ENTRY = struct.Struct("<I")
+
+    def __init__(self, path):
+        with open(path, mode='rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, kind_count, self._pool_offset, _ = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {self.VERSION} .pkdx file")
+        self._directory = {}  # dict of kind to (record count, records offset, name index offset)
+        for position in range(kind_count):
+            kind, count, records_offset, names_offset = self.DIRECTORY_ENTRY.unpack_from(
+                self._map, self.HEADER.size + position * self.DIRECTORY_ENTRY.size)
+            self._directory[kind.rstrip(b"\0").decode("utf-8")] = (count, records_offset, names_offset)
+
+    parse_url = staticmethod(SnapshotStore.parse_url)
+
+    def _record(self, records_offset, number):
+        """
+        Reads a record of a record table.
+
+        :param records_offset: Integer, offset of the record table
+        :param number: Integer, position of the record in the table
+        :return: tuple (id, name offset, name length, body offset, body length)
+        """
+        return self.RECORD.unpack_from(self._map, records_offset + number * self.RECORD.size)
+
+    def _name(self, record):
+        start = self._pool_offset + record[1]
+        return self._map[start:start + record[2]]
+
+    def _find_by_id(self, kind, resource_id):
+        count, records_offset, _ = self._directory[kind]
+        ids = _TableView(count, lambda number: self._record(records_offset, number)[0])
+        number = bisect.bisect_left(ids, resource_id)
+        if number < count:
+            record = self._record(records_offset, number)
+            if record[0] == resource_id:
+                return record
+        return None
+
+    def _find_by_name(self, kind, name):
+        count, records_offset, names_offset = self._directory[kind]
+
+        def record_at(position):
+            (number,) = self.NAME_ENTRY.unpack_from(self._map, names_offset + position * self.NAME_ENTRY.size)
+            return self._record(records_offset, number)
+
+        key = name.encode("utf-8")
+        position = bisect.bisect_left(_TableView(count, lambda position: self._name(record_at(position))), key)
+        if position < count:
+            record = record_at(position)
+            if self._name(record) == key:
+                return record
+        return None
+
+    def get(self, url):
+        """
+        Gets the stored body of the resource url refers to.
+
+        :param url: String
+        :return: bytes/None
+        """
+        kind, key = self.parse_url(url)
+        if kind not in self._directory:
+            return None
+        record = self._find_by_id(kind, int(key)) if key.isdigit() else self._find_by_name(kind, key)
+        if record is None:
+            return None
+        return self._map[record[3]:record[3] + record[4]]
+
+    def iter_kind(self, kind):
+        """
+        Yields every stored resource of a resource type, in id order.
+
+        :param kind: String, resource type e.g. pokemon
+        :return: generator of json
+        """
+        count, records_offset, _ = self._directory.get(kind, (0, 0, 0))
+        for number in range(count):
+            record = self._record(records_offset, number)
+            yield json.loads(self._map[record[3]:record[3] + record[4]])
+
+    def iter_names(self, kind):
+        """
+        Yields the id and name of every stored resource of a resource type.
+
+        :param kind: String, resource type e.g. pokemon
+        :return: generator of (id:int, name:str) tuples
+        """
+        count, records_offset, _ = self._directory.get(kind, (0, 0, 0))
+        for number in range(count):
+            record = self._record(records_offset, number)
+            yield record[0], self._name(record).decode("utf-8")
+
+    def count(self, kind):
+        """
+        Counts the stored resources of a resource type.
+
+        :param kind: String, resource type e.g. pokemon
+        :return: Integer
+        """
+        return self._directory.get(kind, (0,))[0]
+
+    def commit(self):
+        pass
+
+    def close(self):
+        """
+        Unmaps the file.
+
+        :return: None
+        """
+        self._map.close()
+
+    @classmethod
+    def write(cls, store: SnapshotStore, path, kinds):
+        """
+        Writes every resource of the given resource types in store to a .pkdx file, replacing the file at once so
+        processes mapping the old one keep reading it.
+
+        :param store: SnapshotStore
+        :param path: String, filepath
+        :param kinds: iterable of resource types e.g. pokemon
+        :return: dict of resource type to number of resources written
+        """
+        tables = {}
+        pool = bytearray()
+        bodies = bytearray()
+        for kind in kinds:
+            records = []
+            names = []
+            for resource_id, name, body in store.iter_records(kind):
+                names.append(name.encode("utf-8"))
+                records.append((resource_id, len(pool), len(names[-1]), len(bodies), len(body)))
+                pool += names[-1]
+                bodies += body
+            tables[kind] = (records, sorted(range(len(records)), key=names.__getitem__))
+
+        offset = cls.HEADER.size + len(tables) * cls.DIRECTORY_ENTRY.size
+        directory = []
+        for kind, (records, name_order) in tables.items():
+            directory.append((kind.encode("utf-8"), len(records), offset,
+                              offset + len(records) * cls.RECORD.size))
+            offset += len(records) * (cls.RECORD.size + cls.NAME_ENTRY.size)
+        pool_offset = offset
+        bodies_offset = pool_offset + len(pool)
+
+        directory_path = os.path.dirname(path)
+        if directory_path:
+            os.makedirs(directory_path, exist_ok=True)
+        partial_path = f"{path}.partial"
+        with open(partial_path, mode='wb') as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(tables), pool_offset, bodies_offset))
+            for entry in directory:
+                file.write(cls.DIRECTORY_ENTRY.pack(*entry))
+            for records, name_order in tables.values():
+                for resource_id, name_offset, name_length, body_offset, body_length in records:
+                    file.write(cls.RECORD.pack(resource_id, name_offset, name_length, bodies_offset + body_offset,
+                                               body_length))
+                for number in name_order:
+                    file.write(cls.NAME_ENTRY.pack(number))
+            file.write(pool)
+            file.write(bodies)
+        os.replace(partial_path, path)
+        return {kind: len(records) for kind, (records, _) in tables.items()}
+
+
+class _TableView:
+    """
+    _TableView represents a sorted table on the mapped pages as a read-only sequence bisect can search, reading
+    only the entries it is asked for.
+    """
+    __slots__ = ('_length', '_read')
+
+    def __init__(self, length, read):
+        self._length = length
+        self._read = read
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        return self._read(position)
+
+
+def is_pkdx(path):
+    return path.endswith(PKDX_SUFFIX)
+
+
+def open_store(path):
+    """
+    Opens the snapshot at path, a .pkdx file or a SQLite SnapshotStore.
+
+    :param path: String, filepath
+    :return: PkdxStore/SnapshotStore
+    """
+    return PkdxStore(path) if is_pkdx(path) else SnapshotStore(path)
@@ -0,0 +1,111 @@
+"""
+This module contains BatchPlanner class, which plans the sub-resource fetches of a whole batch of expanded Pokemon
+at once, and PlanReport class, what a plan saved.
+"""
+import asyncio
+import sys
+from collections import Counter
+from pokeretriever.PokedexEngine import Pokemon
+from pokeretriever.pokemon_cache import ResponseCache
+from pokeretriever.pokemon_parser import FailedRequest
+
+
+class PlanReport:
+    """
+    PlanReport represents what planning a batch saved: the Stat, Ability and Move references of its Pokemon, each
+    of which is a fetch when every Pokemon expands on its own, against the unique urls the plan fetched.
+    """
+    __slots__ = ('_pokemon', '_references', '_unique')
+
+    def __init__(self, pokemon, references, unique):
+        self._pokemon = pokemon
+        self._references = references
+        self._unique = unique
+
+    @property
+    def saved(self):
+        return self._references - self._unique
+
+    def __str__(self):
+        return (f"Planned {self._pokemon} Pokemon: {self._unique} unique sub-resources fetched instead of "
+                f"{self._references}, {self.saved} fetches saved")
+
+
+class _ResolvedTable:
+    """
+    _ResolvedTable represents the sub-resources a plan resolved, keyed by normalised url, with the exception a url
+    failed with in place of its object. It has the get_object method of PokemonSession, so Pokemon expand from it,
+    a failed url raises its exception again without being fetched again, and only what the table lacks reaches the
+    session.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._objects = {}
+
+    async def get_object(self, url, make_object):
+        key = ResponseCache.normalise_url(url)
+        pokedex_object = self._objects.get(key)
+        if pokedex_object is None:
+            try:
+                pokedex_object = await self._session.get_object(url, make_object)
+            except Exception as e:
+                pokedex_object = e
+            self._objects[key] = pokedex_object
+        if isinstance(pokedex_object, Exception):
+            raise pokedex_object
+        return pokedex_object
+
+
+class BatchPlanner:
+    """
+    BatchPlanner represents the expansion of a batch of Pokemon whose top-level responses were already fetched.
+    Instead of every Pokemon fetching its own Stat, Ability and Move urls, the planner collects the union of them
+    across the batch, fetches each unique url once, the urls shared by the most Pokemon first, and then assembles
+    every Pokemon from the resolved table.
+    """
+
+    def __init__(self, session, report=True):
+        self._session = session
+        self._report = report
+
+    async def expand(self, results):
+        """
+        Expands the Pokemon among results.
+
+        :param results: list of (target url, PokedexObject or FailedRequest) tuples
+        :return: list of PokedexObject or FailedRequest, in the order of results, a FailedRequest for every Pokemon
+                 one of whose sub-resources failed
+        """
+        stats = self._session.stats
+        references = Counter()
+        fields = {}
+        for _, pokedex_object in results:
+            if isinstance(pokedex_object, Pokemon):
+                for url, field in pokedex_object.sub_resources():
+                    key = ResponseCache.normalise_url(url)
+                    references[key] += 1
+                    fields.setdefault(key, field)
+
+        table = _ResolvedTable(self._session)
+        with stats.timer("plan.fetch"):
+            await asyncio.gather(*[fields[key].expanded(table) for key, _ in references.most_common()],
+                                 return_exceptions=True)
+        expanded = []
+        for target_url, pokedex_object in results:
+            if isinstance(pokedex_object, Pokemon):
+                try:
+                    await pokedex_object.expand(table)
+                except Exception as e:
+                    stats.count("failed_requests")
+                    pokedex_object = FailedRequest(target_url, e)
+            expanded.append(pokedex_object)
+
+        report = PlanReport(sum(isinstance(pokedex_object, Pokemon) for _, pokedex_object in results),
+                            sum(references.values()), len(references))
+        stats.count("plan.references", sum(references.values()))
+        stats.count("plan.unique", len(references))
+        stats.count("plan.saved", report.saved)
+        if self._report and references:
+            print(report, file=sys.stderr)
+        return expanded
@@ -0,0 +1,94 @@
+"""
+This module contains the pruning step that cuts PokeAPI responses down to the fields the factories, indexes and
+serializers read, before a response is cached, stored in the snapshot or turned into objects.
+"""
+
+KEEP = True
+NAMED = {'name': KEEP, 'url': KEEP}
+LEVEL_UP = 'level-up'
+
+
+class FirstAnd:
+    """
+    FirstAnd represents the spec of a list of which the first item and every other item matches accepts are kept,
+    pruned with spec.
+    """
+    __slots__ = ('spec', 'matches')
+
+    def __init__(self, spec, matches):
+        self.spec = spec
+        self.matches = matches
+
+
+def is_level_up(details):
+    return (details.get('move_learn_method') or {}).get('name') == LEVEL_UP
+
+
+EFFECT_ENTRIES = {'effect': KEEP, 'short_effect': KEEP, 'language': NAMED}
+
+PRUNE_SPECS = {
+    'pokemon': {
+        'id': KEEP, 'name': KEEP, 'height': KEEP, 'weight': KEEP,
+        'stats': {'base_stat': KEEP, 'stat': NAMED},
+        'types': {'slot': KEEP, 'type': NAMED},
+        'abilities': {'ability': NAMED, 'is_hidden': KEEP, 'slot': KEEP},
+        'moves': {'move': NAMED, 'version_group_details': FirstAnd({'level_learned_at': KEEP,
+                                                                    'move_learn_method': NAMED}, is_level_up)},
+    },
+    'move': {
+        'id': KEEP, 'name': KEEP, 'generation': NAMED, 'accuracy': KEEP, 'pp': KEEP, 'power': KEEP,
+        'type': NAMED, 'damage_class': NAMED, 'effect_entries': EFFECT_ENTRIES,
+    },
+    'ability': {
+        'id': KEEP, 'name': KEEP, 'generation': NAMED, 'effect_entries': EFFECT_ENTRIES,
+        'pokemon': {'pokemon': NAMED, 'is_hidden': KEEP},
+    },
+    'stat': {
+        'id': KEEP, 'name': KEEP, 'is_battle_only': KEEP,
+    },
+}
+
+
+def prune(value, spec):
+    """
+    Keeps the parts of value spec lists. A dict spec keeps the listed keys of a dict, or of every item of a list,
+    a FirstAnd spec keeps the first item of a list and the items it matches and KEEP keeps the value as it is.
+
+    :param value: json
+    :param spec: KEEP, dict or FirstAnd
+    :return: json, a pruned copy of value
+    """
+    if spec is KEEP or value is None:
+        return value
+    if isinstance(spec, FirstAnd):
+        return [prune(item, spec.spec) for position, item in enumerate(value) if position == 0 or spec.matches(item)]
+    if isinstance(value, list):
+        return [prune(item, spec) for item in value]
+    return {key: prune(value[key], sub_spec) for key, sub_spec in spec.items() if key in value}
+
+
+def prune_response(kind, response_json):
+    """
+    Prunes a response of a resource type. Paginated lists and resource types without a spec are left as they are.
+
+    :param kind: String, resource type e.g. pokemon
+    :param response_json: json of the response
+    :return: json
+    """
+    spec = PRUNE_SPECS.get(kind)
+    if spec is None or not isinstance(response_json, dict) or 'results' in response_json:
+        return response_json
+    return prune(response_json, spec)
+
+
+def is_pruned(kind, response_json):
+    """
+    Checks whether a stored response was already pruned. PokeAPI responses always carry top-level fields outside the
+    spec (sprites, names, flavor texts...), so one whose top-level fields all are in the spec was pruned before.
+
+    :param kind: String, resource type e.g. pokemon
+    :param response_json: json of the response
+    :return: bool
+    """
+    spec = PRUNE_SPECS.get(kind)
+    return spec is None or not isinstance(response_json, dict) or response_json.keys() <= spec.keys()
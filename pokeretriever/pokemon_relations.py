@@ -0,0 +1,217 @@
+"""
+This module contains RelationIndex class, the inverted indexes from moves, types and abilities to the Pokemon that
+have them, which answer relational queries without a request per Pokemon, and QueryMatch class, a Pokemon found by
+such a query.
+"""
+import os
+import sys
+import time
+from pokeretriever import pokemon_json
+from pokeretriever.pokemon_index import InvalidQueryException, NameIndex
+from pokeretriever.pokemon_pruning import LEVEL_UP, is_level_up
+from pokeretriever.pokemon_requests import Modes, QueryConfig, CacheConfig
+from pokeretriever.pokemon_snapshot import load_resources
+
+
+class QueryMatch:
+    """
+    QueryMatch represents a Pokemon matching a relational query, with the level it learns the queried moves by when
+    they are all learned by levelling up.
+    """
+    __slots__ = ('_name', '_id', '_level')
+
+    def __init__(self, name, pokemon_id, level=None):
+        self._name = name
+        self._id = pokemon_id
+        self._level = level
+
+    def __str__(self):
+        return self._name if self._level is None else f"{self._name} (level {self._level})"
+
+
+class RelationIndex:
+    """
+    RelationIndex represents the inverted indexes of the Pokedex: move to the Pokemon learning it with the level and
+    method of learning, type to Pokemon and ability to Pokemon. It is built once from every Pokemon response and
+    saved as JSON with the source it was built from, so later queries only read one file as long as the source is
+    the same.
+    """
+    VERSION = 3
+
+    def __init__(self, pokemon_ids, learns, types, abilities, source=None):
+        self._pokemon_ids = pokemon_ids  # dict of pokemon name to id
+        self._learns = learns  # dict of move name to dict of pokemon name to [level, method]
+        self._types = types  # dict of type name to list of pokemon names
+        self._abilities = abilities  # dict of ability name to list of pokemon names
+        self._source = source  # dict, the snapshot path and mtime or the cache directory and build time
+
+    def __len__(self):
+        return len(self._pokemon_ids)
+
+    @classmethod
+    def from_pokemon(cls, responses, source=None):
+        """
+        Builds the indexes from Pokemon responses.
+
+        :param responses: iterable of json of Pokemon
+        :param source: dict, what the responses were read from
+        :return: RelationIndex
+        """
+        pokemon_ids, learns, types, abilities = {}, {}, {}, {}
+        for response in responses:
+            name = response['name']
+            pokemon_ids[name] = response['id']
+            for move in response['moves']:
+                learns.setdefault(move['move']['name'], {})[name] = cls._learned_by(move['version_group_details'])
+            for pokemon_type in response['types']:
+                types.setdefault(pokemon_type['type']['name'], []).append(name)
+            for ability in response['abilities']:
+                abilities.setdefault(ability['ability']['name'], []).append(name)
+        return cls(pokemon_ids, learns, types, abilities, source)
+
+    @staticmethod
+    def _learned_by(details):
+        """
+        Finds how a move is learned across every version group: by levelling up at the lowest level any version
+        group teaches it at, otherwise by the method of the first version group.
+
+        :param details: list of version group details of the move
+        :return: list [level:int, method:str|None]
+        """
+        levels = [detail['level_learned_at'] for detail in details if is_level_up(detail)]
+        if levels:
+            return [min(levels), LEVEL_UP]
+        return [details[0]['level_learned_at'], (details[0].get('move_learn_method') or {}).get('name')] \
+            if details else [0, None]
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads indexes saved by save.
+
+        :param path: String, filepath
+        :return: RelationIndex/None, None if the file was saved by another version
+        """
+        with open(path, mode='rb') as file:
+            saved = pokemon_json.get_decoder()(file.read())
+        if saved.get('version') != cls.VERSION:
+            return None
+        return cls(saved['pokemon'], saved['learns'], saved['types'], saved['abilities'], saved.get('source'))
+
+    def save(self, path):
+        """
+        Saves the indexes as JSON, replacing the file at once so readers never see half of it.
+
+        :param path: String, filepath
+        :return: None
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        partial_path = f"{path}.partial"
+        with open(partial_path, mode='wb') as file:
+            file.write(pokemon_json.dump_bytes({'version': self.VERSION, 'pokemon': self._pokemon_ids,
+                                                'learns': self._learns, 'types': self._types,
+                                                'abilities': self._abilities, 'source': self._source}))
+        os.replace(partial_path, path)
+
+    def is_built_from(self, source, max_age):
+        """
+        Checks the indexes were built from source and, when they were built from the response cache, are no older
+        than max_age.
+
+        :param source: dict, as made by index_source
+        :param max_age: Integer, seconds
+        :return: Boolean
+        """
+        if self._source is None:
+            return False
+        saved = {key: value for key, value in self._source.items() if key != 'built_at'}
+        if saved != {key: value for key, value in source.items() if key != 'built_at'}:
+            return False
+        return 'built_at' not in self._source or time.time() - self._source['built_at'] <= max_age
+
+    @staticmethod
+    def _resolve(kind, relation, content):
+        """
+        Normalises a queried name and checks the index knows it.
+
+        :param kind: String, e.g. move
+        :param relation: dict keyed by name
+        :param content: String, raw name
+        :return: String, normalised name
+        """
+        key = NameIndex.normalise(content)
+        if key in relation:
+            return key
+        suggestions = NameIndex(kind, enumerate(relation)).suggest(key)
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+        raise InvalidQueryException(f"No Pokemon has the {kind} '{content.strip()}'.{hint}")
+
+    def query(self, learns=(), types=(), abilities=(), max_level=None):
+        """
+        Finds the Pokemon that learn every move in learns, have every type in types and every ability in abilities.
+        With max_level the moves must be learned by levelling up to at most max_level.
+
+        :param learns: iterable of move names
+        :param types: iterable of type names
+        :param abilities: iterable of ability names
+        :param max_level: Integer/None
+        :return: list of QueryMatch, in Pokedex order
+        """
+        candidates = set(self._pokemon_ids)
+        for content in types:
+            candidates.intersection_update(self._types[self._resolve('type', self._types, content)])
+        for content in abilities:
+            candidates.intersection_update(self._abilities[self._resolve('ability', self._abilities, content)])
+        learners = [self._learns[self._resolve('move', self._learns, content)] for content in learns]
+        matches = []
+        for name in sorted(candidates, key=self._pokemon_ids.get):
+            if not all(name in learner for learner in learners):
+                continue
+            levels = [learner[name] for learner in learners]
+            by_level_up = bool(levels) and all(method == LEVEL_UP for _, method in levels)
+            level = max(level for level, _ in levels) if by_level_up else None
+            if max_level is not None and (level is None or level > max_level):
+                continue
+            matches.append(QueryMatch(name, self._pokemon_ids[name], level))
+        return matches
+
+
+def index_source(cache_config: CacheConfig, snapshot_path):
+    """
+    Describes what a RelationIndex is built from: the snapshot with its modification time when there is one,
+    otherwise the response cache directory with the time of the build.
+
+    :param cache_config: CacheConfig
+    :param snapshot_path: String, filepath of the snapshot
+    :return: dict
+    """
+    if os.path.exists(snapshot_path):
+        return {'snapshot': os.path.abspath(snapshot_path), 'mtime': os.path.getmtime(snapshot_path)}
+    return {'cache_dir': os.path.abspath(cache_config.cache_dir), 'built_at': time.time()}
+
+
+async def load_relation_index(session, config: QueryConfig, cache_config: CacheConfig, snapshot_path):
+    """
+    Loads the saved RelationIndex, or builds and saves it if there is none, a rebuild is asked for or it was not
+    built from the current source: another snapshot, a snapshot modified since, another cache directory, or the
+    response cache longer ago than the Pokemon TTL. It is built from the snapshot when there is one, otherwise from
+    every Pokemon fetched through the session and its response cache.
+
+    :param session: PokemonSession
+    :param config: QueryConfig
+    :param cache_config: CacheConfig
+    :param snapshot_path: String, filepath of the snapshot
+    :return: RelationIndex
+    """
+    path = config.index_path or os.path.join(cache_config.cache_dir, "relations.json")
+    source = index_source(cache_config, snapshot_path)
+    if not config.rebuild and os.path.exists(path):
+        relation_index = RelationIndex.load(path)
+        if relation_index is not None and relation_index.is_built_from(source, cache_config.ttls.get('pokemon', 0)):
+            return relation_index
+    relation_index = RelationIndex.from_pokemon(await load_resources(session, snapshot_path, Modes.POKEMON), source)
+    relation_index.save(path)
+    print(f"Indexed {len(relation_index)} Pokemon into {path}", file=sys.stderr)
+    return relation_index
@@ -1,8 +1,12 @@
 """
-This module contains Modes enum and Request class.
+This module contains Modes enum, Request class and the configuration classes used to build a session.
 """
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import os
+
+
+API_ROOT = "https://pokeapi.co/api/v2"
 
 
 class Modes(str, Enum):
@@ -12,6 +16,83 @@ class Modes(str, Enum):
     STAT = "https://pokeapi.co/api/v2/stat"
 
 
+DAY = 24 * 60 * 60
+
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pokeretriever")
+
+# JSON decoders a session can be configured with, auto picks the fastest installed one.
+AUTO = 'auto'
+ORJSON = 'orjson'
+SIMDJSON = 'simdjson'
+STDLIB = 'json'
+DECODERS = (AUTO, ORJSON, SIMDJSON, STDLIB)
+
+# Seconds a cached response of each resource type stays fresh, keyed by the resource segment of its url.
+DEFAULT_CACHE_TTLS = {
+    "pokemon": 7 * DAY,
+    "ability": 30 * DAY,
+    "move": 30 * DAY,
+    "stat": 365 * DAY,
+}
+
+
+@dataclass(frozen=True)
+class FieldProjection:
+    """
+    FieldProjection holds which fields of the results are wanted, e.g. "name,types,stats,moves.power". A dotted
+    field expands that collection, even without --expanded, and keeps only the listed fields (plus the name) of its
+    expanded objects.
+    """
+    fields: frozenset
+    sub_fields: dict
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parses a comma separated list of fields.
+
+        :param text: String/None
+        :return: FieldProjection/None, None when every field is wanted
+        """
+        if not text or not text.strip():
+            return None
+        fields = set()
+        sub_fields = {}
+        for item in text.split(","):
+            item = item.strip().lower()
+            if not item:
+                continue
+            field, _, sub_field = item.partition(".")
+            fields.add(field)
+            if sub_field:
+                sub_fields.setdefault(field, set()).add(sub_field)
+        return cls(frozenset(fields), {field: frozenset(names) for field, names in sub_fields.items()})
+
+    def to_text(self):
+        """
+        Turns the projection back into the comma separated list parse reads.
+
+        :return: String
+        """
+        return ",".join(sorted(self.fields | {f"{field}.{sub_field}" for field, names in self.sub_fields.items()
+                                              for sub_field in names}))
+
+    def includes(self, field):
+        return field in self.fields
+
+    def expands(self, field):
+        return field in self.sub_fields
+
+    def sub_fields_of(self, field):
+        """
+        Gets the fields kept of the expanded objects of a collection.
+
+        :param field: String, e.g. moves
+        :return: frozenset/None, None when every field is kept
+        """
+        return self.sub_fields.get(field)
+
+
 @dataclass
 class Request:
     search_mode: str
@@ -19,4 +100,118 @@ class Request:
     input_data: str
     is_expanded: bool
     output: str
+    use_index: bool = True
+    fields: FieldProjection = None
+    plan: bool = False
+
+
+@dataclass
+class SessionConfig:
+    """
+    SessionConfig holds the connection pool settings of the shared PokemonSession and where it resolves resources
+    from.
+    """
+    pool_size: int = 100
+    pool_per_host: int = 20
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    memo_size: int = 4096
+    snapshot_path: str = os.path.join(DEFAULT_DATA_DIR, "snapshot.sqlite3")
+    offline: bool = False
+    base_url: str = API_ROOT
+    decoder: str = AUTO
+    prune: bool = True
 
+
+@dataclass
+class SchedulerConfig:
+    """
+    SchedulerConfig holds the limits the RequestScheduler applies to every HTTP request.
+    """
+    concurrency: int = 20
+    rate: float = 50.0
+    burst: float = 0.0
+    retries: int = 5
+    backoff_base: float = 0.5
+    backoff_cap: float = 30.0
+    timeout: float = 30.0
+    queue_size: int = 100
+    workers: int = 1
+
+
+@dataclass
+class OutputConfig:
+    """
+    OutputConfig holds the settings of the OutputWriter results are streamed to.
+    """
+    format: str = 'text'
+    ordered: bool = False
+    flush_every: int = 50
+    flush_interval: float = 1.0
+    buffer_size: int = 64 * 1024
+    journal: bool = False
+    resume: bool = False
+
+
+@dataclass
+class StatsConfig:
+    """
+    StatsConfig holds whether the run is instrumented and where its Chrome trace goes.
+    """
+    enabled: bool = False
+    trace_path: str = None
+
+
+@dataclass
+class DaemonConfig:
+    """
+    DaemonConfig holds where the local lookup daemon listens and whether driver.py forwards to it.
+    """
+    socket_path: str = os.path.join(DEFAULT_DATA_DIR, "daemon.sock")
+    host: str = "127.0.0.1"
+    port: int = 8642
+    forward: bool = True
+
+
+@dataclass
+class CacheConfig:
+    """
+    CacheConfig holds the settings of the on-disk ResponseCache that sits under every GET request and of the
+    revalidation of its stale entries.
+    """
+    cache_dir: str = DEFAULT_DATA_DIR
+    enabled: bool = True
+    refresh: bool = False
+    max_bytes: int = 256 * 1024 * 1024
+    ttls: dict = field(default_factory=lambda: dict(DEFAULT_CACHE_TTLS))
+    revalidate: bool = True
+    revalidate_batch: int = 50
+
+
+@dataclass
+class QueryConfig:
+    """
+    QueryConfig holds the filters of a relational query and where the RelationIndex answering it is saved, None for
+    relations.json in the cache directory.
+    """
+    learns: tuple = ()
+    types: tuple = ()
+    abilities: tuple = ()
+    max_level: int = None
+    index_path: str = None
+    rebuild: bool = False
+
+
+@dataclass
+class AnalyticsConfig:
+    """
+    AnalyticsConfig holds what an analytics report is computed over and what it holds. by None sorts Pokemon by
+    their stat total and moves by their power, teams are (name, members) pairs.
+    """
+    table: str = 'pokemon'
+    top: int = 10
+    by: str = None
+    where: tuple = ()
+    types: tuple = ()
+    percentiles: tuple = ()
+    teams: tuple = ()
@@ -0,0 +1,68 @@
+"""
+This module contains Revalidator class, which revalidates stale cached responses in the background.
+"""
+import asyncio
+
+
+class Revalidator:
+    """
+    Revalidator represents the background revalidation of stale cached responses. Their stored bodies keep being
+    served while the urls are queued, and a background task hands them to revalidate_batch batch_size at a time, so
+    the conditional GETs of a batch run concurrently and their results are written to the cache together. A url is
+    only queued once while it waits or its batch runs, and can be queued again once it goes stale again.
+    """
+
+    def __init__(self, revalidate_batch, batch_size):
+        self._revalidate_batch = revalidate_batch  # coroutine function taking a list of (url, CachedResponse)
+        self._batch_size = max(1, batch_size)
+        self._pending = {}
+        self._submitted = set()  # keys queued or in flight
+        self._task = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def submit(self, key, url, cached):
+        """
+        Queues a stale url for revalidation unless it is already queued or in flight, starting the background task
+        if it is idle.
+
+        :param key: String, normalised url
+        :param url: String
+        :param cached: CachedResponse, the stale entry with its validators
+        :return: None
+        """
+        if key in self._submitted:
+            return
+        self._submitted.add(key)
+        self._pending[key] = (url, cached)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        """
+        Revalidates the queued urls batch by batch until the queue is empty. It yields once first, so stale urls
+        submitted by the lookups running alongside it join the first batch.
+
+        :return: None
+        """
+        await asyncio.sleep(0)
+        while self._pending:
+            keys = list(self._pending)[:self._batch_size]
+            try:
+                await self._revalidate_batch([self._pending.pop(key) for key in keys])
+            finally:
+                self._submitted.difference_update(keys)
+
+    async def close(self):
+        """
+        Drops the urls still queued and waits for the batch in flight, so shutting down never waits for a backlog of
+        stale entries. The dropped entries stay stale and are revalidated by a later run.
+
+        :return: None
+        """
+        self._submitted.difference_update(self._pending)
+        self._pending.clear()
+        if self._task is not None:
+            await self._task
+            self._task = None
@@ -0,0 +1,144 @@
+"""
+This module contains RequestScheduler class and the helpers it uses to keep requests under PokeAPI's limits.
+"""
+import asyncio
+import email.utils
+import random
+import time
+from pokeretriever.pokemon_requests import SchedulerConfig
+
+
+class RequestFailedError(Exception):
+    """
+    RequestFailedError is a custom Exception class raised when a request still fails after every retry.
+    """
+
+    def __init__(self, url, attempts, cause):
+        super().__init__(f"GET {url} failed after {attempts} attempt(s): {cause}")
+        self.url = url
+        self.attempts = attempts
+        self.cause = cause
+
+
+class TokenBucket:
+    """
+    TokenBucket represents a requests-per-second limit that allows short bursts of up to burst requests.
+    """
+
+    def __init__(self, rate, burst):
+        self._rate = rate
+        self._burst = max(1.0, burst)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        """
+        Waits until a token is available and takes it. A rate of 0 or less means no limit.
+
+        :return: None
+        """
+        if self._rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class RequestScheduler:
+    """
+    RequestScheduler represents the gate every HTTP request goes through. It caps the number of requests in flight,
+    limits the request rate with a TokenBucket and retries throttled, failing or timed out requests with exponential
+    backoff and jitter, pausing every request while the API asks us to via Retry-After.
+    """
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, config: SchedulerConfig = None):
+        self._config = config or SchedulerConfig()
+        self._semaphore = asyncio.Semaphore(self._config.concurrency)
+        self._bucket = TokenBucket(self._config.rate, self._config.burst or self._config.rate)
+        self._paused_until = 0.0
+
+    async def run(self, make_attempt, url):
+        """
+        Runs the coroutine made by make_attempt until it succeeds or the retries run out.
+
+        :param make_attempt: callable returning a coroutine that makes one attempt at the request
+        :param url: String, only used to describe the failure
+        :return: result of the successful attempt
+        """
+        attempt = 0
+        while True:
+            await self._wait_for_pause()
+            await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    return await make_attempt()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                attempt += 1
+                if delay is None or attempt > self._config.retries:
+                    if delay is None:
+                        raise
+                    raise RequestFailedError(url, attempt, e) from e
+            await asyncio.sleep(delay)
+
+    async def _wait_for_pause(self):
+        """
+        Waits while a Retry-After pause is in effect.
+
+        :return: None
+        """
+        remaining = self._paused_until - time.monotonic()
+        while remaining > 0:
+            await asyncio.sleep(remaining)
+            remaining = self._paused_until - time.monotonic()
+
+    def _retry_delay(self, error, attempt):
+        """
+        Gets the number of seconds to wait before retrying after error.
+
+        :param error: Exception raised by the attempt
+        :param attempt: Integer, number of attempts that already failed before this one
+        :return: Float/None, None when error is not worth retrying
+        """
+        import aiohttp
+        if isinstance(error, aiohttp.ClientResponseError):
+            if error.status not in self.RETRY_STATUSES:
+                return None
+            retry_after = self.parse_retry_after(error.headers)
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                return retry_after
+        elif not isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError,
+                                    aiohttp.ClientPayloadError)):
+            return None
+        ceiling = min(self._config.backoff_cap, self._config.backoff_base * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def parse_retry_after(headers):
+        """
+        Parses the Retry-After header, given either in seconds or as an HTTP date.
+
+        :param headers: mapping of response headers, may be None
+        :return: Float/None, seconds to wait
+        """
+        value = headers.get("Retry-After") if headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at is None:
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
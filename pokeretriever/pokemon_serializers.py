@@ -0,0 +1,226 @@
+"""
+This module contains one serializer per PokedexObject type that turns objects into flat records with a stable schema.
+"""
+import abc
+from pokeretriever.PokedexEngine import Pokemon, Move, Ability, Stat, PokemonStat, PokemonMove, PokemonAbility
+from pokeretriever.pokemon_analytics import AnalyticsRow, POKEMON_COLUMNS, MOVE_COLUMNS
+from pokeretriever.pokemon_parser import FailedRequest
+from pokeretriever.pokemon_relations import QueryMatch
+from pokeretriever.pokemon_requests import FieldProjection
+
+
+class PokedexSerializer(abc.ABC):
+    """
+    PokedexSerializer represents the serializer of one PokedexObject type. FIELDS is the stable schema of its records,
+    every record has exactly those keys in that order.
+    """
+    KIND = None
+    FIELDS = ()
+
+    @abc.abstractmethod
+    def to_record(self, pokedex_object) -> dict:
+        pass
+
+
+class MoveSerializer(PokedexSerializer):
+    """
+    MoveSerializer represents the serializer of Move objects.
+    """
+    KIND = 'move'
+    FIELDS = ('kind', 'id', 'name', 'generation', 'accuracy', 'pp', 'power', 'type', 'damage_class', 'effect_short')
+
+    def to_record(self, move: Move) -> dict:
+        return {'kind': self.KIND, 'id': move._id, 'name': move._name, 'generation': move._generation,
+                'accuracy': move._accuracy, 'pp': move._pp, 'power': move._power, 'type': move._type,
+                'damage_class': move._damage_class, 'effect_short': move._effect_short}
+
+
+class AbilitySerializer(PokedexSerializer):
+    """
+    AbilitySerializer represents the serializer of Ability objects.
+    """
+    KIND = 'ability'
+    FIELDS = ('kind', 'id', 'name', 'generation', 'effect', 'effect_short', 'pokemon')
+
+    def to_record(self, ability: Ability) -> dict:
+        return {'kind': self.KIND, 'id': ability._id, 'name': ability._name, 'generation': ability._generation,
+                'effect': ability._effect, 'effect_short': ability._effect_short, 'pokemon': list(ability._pokemons)}
+
+
+class StatSerializer(PokedexSerializer):
+    """
+    StatSerializer represents the serializer of Stat objects.
+    """
+    KIND = 'stat'
+    FIELDS = ('kind', 'id', 'name', 'is_battle_only')
+
+    def to_record(self, stat: Stat) -> dict:
+        return {'kind': self.KIND, 'id': stat._id, 'name': stat._name, 'is_battle_only': stat._is_battle_only}
+
+
+class QueryMatchSerializer(PokedexSerializer):
+    """
+    QueryMatchSerializer represents the serializer of QueryMatch objects.
+    """
+    KIND = 'match'
+    FIELDS = ('kind', 'id', 'name', 'level')
+
+    def to_record(self, query_match: QueryMatch) -> dict:
+        return {'kind': self.KIND, 'id': query_match._id, 'name': query_match._name, 'level': query_match._level}
+
+
+class AnalyticsRowSerializer(PokedexSerializer):
+    """
+    AnalyticsRowSerializer represents the serializer of AnalyticsRow objects, whose kind is top, percentile or team.
+    The fields a row has no value for are None.
+    """
+    FIELDS = ('kind', 'rank', 'id', 'name', 'percentile', 'members') + POKEMON_COLUMNS + ('team_total',) + \
+        MOVE_COLUMNS
+
+    def to_record(self, analytics_row: AnalyticsRow) -> dict:
+        return {field: analytics_row._kind if field == 'kind' else analytics_row._values.get(field)
+                for field in self.FIELDS}
+
+
+class PokemonSerializer(PokedexSerializer):
+    """
+    PokemonSerializer represents the serializer of Pokemon objects. Stats, abilities and moves are nested lists
+    whose items carry the fields of the expanded Stat, Ability or Move once it has been fetched.
+    """
+    KIND = 'pokemon'
+    FIELDS = ('kind', 'id', 'name', 'height', 'weight', 'types', 'stats', 'abilities', 'moves')
+
+    def __init__(self):
+        self._stat_serializer = StatSerializer()
+        self._ability_serializer = AbilitySerializer()
+        self._move_serializer = MoveSerializer()
+
+    def _stat_record(self, stat: PokemonStat) -> dict:
+        record = {'name': stat._name, 'base_value': stat._base_value}
+        if stat._stat is not None:
+            record.update(self._stat_serializer.to_record(stat._stat))
+            del record['kind']
+        return record
+
+    def _ability_record(self, ability: PokemonAbility) -> dict:
+        record = {'name': ability._name}
+        if ability._ability is not None:
+            record.update(self._ability_serializer.to_record(ability._ability))
+            del record['kind']
+        return record
+
+    def _move_record(self, move: PokemonMove) -> dict:
+        record = {'name': move._name, 'level': move._level}
+        if move._move is not None:
+            record.update(self._move_serializer.to_record(move._move))
+            del record['kind']
+        return record
+
+    def to_record(self, pokemon: Pokemon) -> dict:
+        return {'kind': self.KIND, 'id': pokemon._id, 'name': pokemon._name,
+                'height': pokemon._height, 'weight': pokemon._weight, 'types': list(pokemon._types),
+                'stats': [self._stat_record(stat) for stat in pokemon._stats],
+                'abilities': [self._ability_record(ability) for ability in pokemon._abilities],
+                'moves': [self._move_record(move) for move in pokemon._moves]}
+
+
+class RenderedResult:
+    """
+    RenderedResult represents a result rendered elsewhere, e.g. by a running daemon, as its text and its record.
+    """
+    __slots__ = ('_text', '_record')
+
+    def __init__(self, text, record):
+        self._text = text
+        self._record = record
+
+    def __str__(self):
+        return self._text
+
+
+class RenderedResultSerializer(PokedexSerializer):
+    """
+    RenderedResultSerializer represents the serializer of RenderedResult, whose record is already made.
+    """
+    KIND = None
+
+    def to_record(self, rendered_result: RenderedResult) -> dict:
+        return rendered_result._record
+
+
+class FailedRequestSerializer(PokedexSerializer):
+    """
+    FailedRequestSerializer represents the serializer of FailedRequest results.
+    """
+    KIND = 'error'
+    FIELDS = ('kind', 'input', 'error')
+
+    def to_record(self, failed_request: FailedRequest) -> dict:
+        return {'kind': self.KIND, 'input': failed_request._target_url, 'error': str(failed_request._error)}
+
+
+SERIALIZER_MAPPER = {
+    Pokemon: PokemonSerializer(),
+    Move: MoveSerializer(),
+    Ability: AbilitySerializer(),
+    Stat: StatSerializer(),
+    FailedRequest: FailedRequestSerializer(),
+    RenderedResult: RenderedResultSerializer(),
+    QueryMatch: QueryMatchSerializer(),
+    AnalyticsRow: AnalyticsRowSerializer(),
+}
+
+SCHEMA_MAPPER = {
+    "pokemon": PokemonSerializer.FIELDS,
+    "ability": AbilitySerializer.FIELDS,
+    "move": MoveSerializer.FIELDS,
+}
+SCHEMA_MAPPER["mixed"] = tuple(dict.fromkeys(field for fields in SCHEMA_MAPPER.values() for field in fields))
+SCHEMA_MAPPER["query"] = QueryMatchSerializer.FIELDS
+SCHEMA_MAPPER["analytics"] = AnalyticsRowSerializer.FIELDS
+
+
+def project_record(record, projection: FieldProjection) -> dict:
+    """
+    Keeps only the projected fields of a record. The kind is always kept, as is the name of every nested item.
+
+    :param record: dict
+    :param projection: FieldProjection
+    :return: dict
+    """
+    projected = {}
+    for field, value in record.items():
+        if field == 'kind' or projection.includes(field):
+            sub_fields = projection.sub_fields_of(field)
+            if sub_fields is not None and isinstance(value, list):
+                value = [{key: item_value for key, item_value in item.items()
+                          if key == 'name' or key in sub_fields} for item in value]
+            projected[field] = value
+    return projected
+
+
+def project_schema(fields, projection: FieldProjection):
+    """
+    Keeps only the projected fields of a schema, in schema order.
+
+    :param fields: tuple of strings
+    :param projection: FieldProjection/None
+    :return: tuple of strings
+    """
+    if projection is None:
+        return fields
+    return tuple(field for field in fields if field == 'kind' or projection.includes(field))
+
+
+def to_record(pokedex_object, projection: FieldProjection = None) -> dict:
+    """
+    Serializes a PokedexObject or FailedRequest with the serializer of its type.
+
+    :param pokedex_object: PokedexObject class object or FailedRequest
+    :param projection: FieldProjection/None, None keeps every field
+    :return: dict
+    """
+    record = SERIALIZER_MAPPER[type(pokedex_object)].to_record(pokedex_object)
+    if projection is None or record['kind'] == FailedRequestSerializer.KIND:
+        return record
+    return project_record(record, projection)
@@ -0,0 +1,353 @@
+"""
+This module contains PokemonSession class that owns the single pooled HTTP session used by a run.
+"""
+import asyncio
+import os
+from pokeretriever import pokemon_json
+from pokeretriever.pokemon_cache import ResponseCache, ObjectMemo
+from pokeretriever.pokemon_pkdx import open_store
+from pokeretriever.pokemon_pruning import prune_response, is_pruned
+from pokeretriever.pokemon_requests import SessionConfig, CacheConfig, SchedulerConfig, API_ROOT
+from pokeretriever.pokemon_revalidator import Revalidator
+from pokeretriever.pokemon_scheduler import RequestScheduler
+from pokeretriever.pokemon_stats import NullStats
+
+
+class OfflineLookupError(LookupError):
+    """
+    OfflineLookupError is a custom Exception class raised when offline mode asks for a url the snapshot lacks.
+    """
+    pass
+
+
+class FetchedResponse:
+    """
+    FetchedResponse represents the response of a GET request: its status, its body, empty when it is 304 Not
+    Modified, and its validators.
+    """
+    __slots__ = ('status', 'body', 'etag', 'last_modified')
+    NOT_MODIFIED = 304
+
+    def __init__(self, status, body, etag=None, last_modified=None):
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def is_not_modified(self):
+        return self.status == self.NOT_MODIFIED
+
+
+class PokemonSession:
+    """
+    PokemonSession represents the one HTTP session shared by the parser, the factories and every sub-resource
+    lookup, so that connections are kept alive and reused instead of being opened once per URL. Responses are
+    read through the on-disk ResponseCache unless caching is disabled. Concurrent lookups of the same url share one
+    in-flight request and parsed sub-resources are memoised in an ObjectMemo for the life of the session. Expired
+    cached responses that have validators are served while a Revalidator checks them with conditional GETs in the
+    background, so keeping the cache current mostly costs headers rather than whole payloads. Requests
+    that do reach the network go through a RequestScheduler. In offline mode every url is resolved from the
+    snapshot, a SnapshotStore or a mapped PkdxStore, instead and no HTTP session is opened at all. The HTTP
+    session is only opened, and aiohttp only imported, once a url has to be fetched, so runs answered from the
+    cache never pay for it. Instrumentation is recorded in stats, which does nothing unless a RunStats is given.
+    """
+
+    def __init__(self, config: SessionConfig = None, cache_config: CacheConfig = None,
+                 scheduler_config: SchedulerConfig = None, stats: NullStats = None):
+        self._config = config or SessionConfig()
+        self._cache_config = cache_config or CacheConfig()
+        self._scheduler_config = scheduler_config or SchedulerConfig()
+        self._scheduler = RequestScheduler(self._scheduler_config)
+        self._session = None
+        self._is_open = False
+        self._cache = None
+        self._snapshot = None
+        self._memo = ObjectMemo(self._config.memo_size)
+        self._in_flight = {}
+        self._revalidator = Revalidator(self._revalidate, self._cache_config.revalidate_batch)
+        self._loads = pokemon_json.get_decoder(self._config.decoder)
+        self.stats = stats or NullStats()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def snapshot(self):
+        """
+        SnapshotStore or PkdxStore the session resolves from in offline mode, None otherwise.
+        """
+        return self._snapshot
+
+    @property
+    def is_caching(self):
+        return self._cache is not None
+
+    @staticmethod
+    def check_snapshot(config: SessionConfig):
+        """
+        Checks that the snapshot an offline session resolves from exists.
+
+        :param config: SessionConfig
+        :return: None, raises OfflineLookupError if offline and there is no snapshot
+        """
+        if config.offline and not os.path.exists(config.snapshot_path):
+            raise OfflineLookupError(f"No snapshot at {config.snapshot_path}, run the snapshot command")
+
+    async def open(self):
+        """
+        Opens the snapshot in offline mode, otherwise the response cache.
+
+        :return: None
+        """
+        if self._is_open:
+            return
+        if self._config.offline:
+            self.check_snapshot(self._config)
+            self._snapshot = open_store(self._config.snapshot_path)
+        elif self._cache_config.enabled:
+            self._cache = ResponseCache(self._cache_config.cache_dir, self._cache_config.max_bytes,
+                                        self._cache_config.ttls)
+        self._is_open = True
+
+    def _http_session(self):
+        """
+        Gets the underlying aiohttp.ClientSession with a keep-alive connection pool, creating it on first use.
+
+        :return: aiohttp.ClientSession
+        """
+        if self._session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self._config.pool_size,
+                                             limit_per_host=self._config.pool_per_host,
+                                             keepalive_timeout=self._config.keepalive_timeout,
+                                             use_dns_cache=True,
+                                             ttl_dns_cache=self._config.dns_cache_ttl)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self._scheduler_config.timeout),
+                                                  trace_configs=self.stats.make_trace_configs())
+        return self._session
+
+    async def close(self):
+        """
+        Waits for the revalidation batch in flight, then closes the underlying aiohttp.ClientSession, its connection
+        pool and the response cache.
+
+        :return: None
+        """
+        await self._revalidator.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self._is_open = False
+
+    async def _single_flight(self, key, make_coroutine):
+        """
+        Runs the coroutine made by make_coroutine unless one is already running under key, in which case its
+        result is awaited instead.
+
+        :param key: hashable, identity of the work
+        :param make_coroutine: callable returning a coroutine
+        :return: result of the coroutine
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make_coroutine())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.stats.count("coalesced")
+        return await asyncio.shield(task)
+
+    async def get_json(self, url):
+        """
+        Gets request for information and puts it in json form. Callers asking for the same url at the same time
+        share a single request.
+
+        :param url: String
+        :return: json, shared between callers so it must not be mutated
+        """
+        return await self._single_flight(("json", ResponseCache.normalise_url(url)), lambda: self._get_json(url))
+
+    async def get_object(self, url, make_object):
+        """
+        Gets the object parsed from the response of url, from the memo when it has already been built.
+
+        :param url: String
+        :param make_object: callable building the object from the json response
+        :return: object built by make_object, shared between callers
+        """
+        key = ResponseCache.normalise_url(url)
+        pokedex_object = self._memo.get(key)
+        if pokedex_object is None:
+            self.stats.count("memo.miss")
+            pokedex_object = await self._single_flight(("object", key),
+                                                       lambda: self._make_object(key, url, make_object))
+        else:
+            self.stats.count("memo.hit")
+        return pokedex_object
+
+    async def _make_object(self, key, url, make_object):
+        """
+        Builds the object from the response of url and memoises it under key.
+
+        :param key: String, normalised url
+        :param url: String
+        :param make_object: callable building the object from the json response
+        :return: object built by make_object
+        """
+        with self.stats.timer(f"expand.{ResponseCache.resource_kind(url)}"):
+            response_json = await self.get_json(url)
+            pokedex_object = make_object(response_json)
+        self._memo.put(key, pokedex_object)
+        return pokedex_object
+
+    async def _get_json(self, url):
+        """
+        Gets request for information and puts it in json form, from the snapshot in offline mode, otherwise from
+        the cache when a fresh copy is stored. An expired copy with validators is served as it is and revalidated
+        in the background, or revalidated before it is used on refresh.
+
+        :param url: String
+        :return: json
+        """
+        if self._snapshot is not None:
+            body = self._snapshot.get(url)
+            if body is None:
+                raise OfflineLookupError(f"{url} is not in the snapshot")
+            self.stats.count("snapshot.hit")
+            return self._decode(url, body)
+
+        cached = self._cache.lookup(url) if self._cache is not None else None
+        if cached is not None and not self._cache_config.refresh:
+            if cached.is_fresh:
+                self.stats.count("cache.hit")
+                self.stats.count("cache.bytes_served", len(cached.body))
+                return self._decode(url, cached.body)
+            if cached.has_validators and self._cache_config.revalidate:
+                self.stats.count("cache.stale")
+                self.stats.count("cache.bytes_served", len(cached.body))
+                self._revalidator.submit(ResponseCache.normalise_url(url), url, cached)
+                return self._decode(url, cached.body)
+        if self._cache is not None:
+            self.stats.count("cache.miss")
+
+        if cached is None or not cached.has_validators:
+            cached = None
+        response = await self._fetch(url, cached)
+        if response.is_not_modified:
+            self.stats.count("revalidate.not_modified")
+            self._cache.touch([url])
+            return self._decode(url, cached.body)
+        return self._store(url, response)
+
+    def _store(self, url, response: FetchedResponse):
+        """
+        Decodes a freshly fetched response and caches its pruned body with its validators.
+
+        :param url: String
+        :param response: FetchedResponse
+        :return: json
+        """
+        body = response.body
+        response_json = self._decode(url, body, fresh=True)
+        if self._config.prune:
+            pruned_body = pokemon_json.dump_bytes(response_json)
+            self.stats.count("prune.bytes_saved", len(body) - len(pruned_body))
+            body = pruned_body
+        if self._cache is not None:
+            self._cache.put(url, body, response.etag, response.last_modified)
+        return response_json
+
+    async def _revalidate(self, stale):
+        """
+        Revalidates a batch of expired cache entries with concurrent conditional GETs. The entries the API reports
+        as not modified are marked fresh together, the changed ones are replaced and failures, including bodies that
+        do not decode, are counted and left to expire.
+
+        :param stale: list of (url, CachedResponse) tuples
+        :return: None
+        """
+        with self.stats.timer("revalidate.batch"):
+            responses = await asyncio.gather(*(self._fetch(url, cached) for url, cached in stale),
+                                             return_exceptions=True)
+        not_modified = []
+        for (url, _), response in zip(stale, responses):
+            if isinstance(response, Exception):
+                self.stats.count("revalidate.failed")
+            elif response.is_not_modified:
+                not_modified.append(url)
+            else:
+                try:
+                    self._store(url, response)
+                except Exception:
+                    self.stats.count("revalidate.failed")
+                    continue
+                self.stats.count("revalidate.modified")
+        if self._cache is not None:
+            self._cache.touch(not_modified)
+        self.stats.count("revalidate.not_modified", len(not_modified))
+
+    def _decode(self, url, body, fresh=False):
+        """
+        Decodes a response body into json with the configured decoder and prunes it down to the fields that are
+        read, unless pruning is turned off. Stored bodies are only pruned if they were stored whole.
+
+        :param url: String, url the body is the response of
+        :param body: bytes
+        :param fresh: bool, True if body was just fetched from the API
+        :return: json
+        """
+        with self.stats.timer("json.decode"):
+            response_json = self._loads(body)
+        kind = ResponseCache.resource_kind(url)
+        if not self._config.prune or (not fresh and is_pruned(kind, response_json)):
+            return response_json
+        with self.stats.timer("json.prune"):
+            return prune_response(kind, response_json)
+
+    async def _fetch(self, url, cached=None):
+        """
+        Gets the response of url through the scheduler, retrying when the API throttles or fails. With a cached
+        response the request is conditional on its validators.
+
+        :param url: String
+        :param cached: CachedResponse/None
+        :return: FetchedResponse
+        """
+        headers = {}
+        if cached is not None:
+            if cached.etag is not None:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified is not None:
+                headers["If-Modified-Since"] = cached.last_modified
+        self.stats.count("http.requests")
+        with self.stats.timer("http.fetch"):
+            return await self._scheduler.run(lambda: self._fetch_once(url, headers), url)
+
+    async def _fetch_once(self, url, headers):
+        """
+        Makes a single attempt at getting the response of url using the pooled session, sending it to the
+        configured base url instead of PokeAPI if one is set.
+
+        :param url: String
+        :param headers: dict of request headers
+        :return: FetchedResponse
+        """
+        if self._config.base_url != API_ROOT and url.startswith(API_ROOT):
+            url = self._config.base_url.rstrip("/") + url[len(API_ROOT):]
+        async with self._http_session().get(url, headers=headers) as response:
+            response.raise_for_status()
+            body = b"" if response.status == FetchedResponse.NOT_MODIFIED else await response.read()
+            return FetchedResponse(response.status, body, response.headers.get("ETag"),
+                                   response.headers.get("Last-Modified"))
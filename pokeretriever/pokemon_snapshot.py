@@ -0,0 +1,206 @@
+"""
+This module contains SnapshotStore class, the local Pokedex snapshot used by offline mode, and the crawler that
+builds it.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+from urllib.parse import urlsplit
+from pokeretriever.pokemon_cache import ResponseCache
+from pokeretriever.pokemon_requests import Modes
+
+
+class SnapshotStore:
+    """
+    SnapshotStore represents a compact SQLite copy of every pokemon, move, ability and stat resource, indexed by
+    resource type and both id and name so any PokeAPI url can be resolved locally.
+    """
+    LIST_PAGE_SIZE = 1000
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute("CREATE TABLE IF NOT EXISTS resources ("
+                         "kind TEXT NOT NULL, id INTEGER NOT NULL, name TEXT NOT NULL, body BLOB NOT NULL, "
+                         "PRIMARY KEY (kind, id))")
+        self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS resources_name ON resources (kind, name)")
+
+    @staticmethod
+    def parse_url(url):
+        """
+        Splits a resource url into its resource type and the name or id it refers to.
+
+        :param url: String, e.g. https://pokeapi.co/api/v2/move/5/
+        :return: tuple (kind:str, key:str)
+        """
+        key = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1].lower()
+        return ResponseCache.resource_kind(url), key
+
+    def get(self, url):
+        """
+        Gets the stored body of the resource url refers to.
+
+        :param url: String
+        :return: bytes/None
+        """
+        kind, key = self.parse_url(url)
+        column = "id" if key.isdigit() else "name"
+        row = self._db.execute(f"SELECT body FROM resources WHERE kind = ? AND {column} = ?",
+                               (kind, int(key) if key.isdigit() else key)).fetchone()
+        return row[0] if row else None
+
+    def put(self, kind, response_json):
+        """
+        Stores a resource, replacing any previous copy of it.
+
+        :param kind: String, resource type e.g. move
+        :param response_json: json of the resource
+        :return: None
+        """
+        self._db.execute("INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?)",
+                         (kind, response_json['id'], response_json['name'],
+                          json.dumps(response_json, separators=(",", ":")).encode("utf-8")))
+
+    def iter_kind(self, kind):
+        """
+        Yields every stored resource of a resource type.
+
+        :param kind: String, resource type e.g. pokemon
+        :return: generator of json
+        """
+        for (body,) in self._db.execute("SELECT body FROM resources WHERE kind = ? ORDER BY id", (kind,)):
+            yield json.loads(body)
+
+    def iter_records(self, kind):
+        """
+        Yields the id, name and stored body of every resource of a resource type, in id order.
+
+        :param kind: String, resource type e.g. pokemon
+        :return: generator of (id:int, name:str, body:bytes) tuples
+        """
+        yield from self._db.execute("SELECT id, name, body FROM resources WHERE kind = ? ORDER BY id", (kind,))
+
+    def iter_names(self, kind):
+        """
+        Yields the id and name of every stored resource of a resource type.
+
+        :param kind: String, resource type e.g. pokemon
+        :return: generator of (id:int, name:str) tuples
+        """
+        yield from self._db.execute("SELECT id, name FROM resources WHERE kind = ?", (kind,))
+
+    def count(self, kind):
+        """
+        Counts the stored resources of a resource type.
+
+        :param kind: String, resource type e.g. pokemon
+        :return: Integer
+        """
+        return self._db.execute("SELECT COUNT(*) FROM resources WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def commit(self):
+        self._db.commit()
+
+    def close(self):
+        """
+        Commits pending writes and closes the SQLite connection.
+
+        :return: None
+        """
+        self._db.commit()
+        self._db.close()
+
+
+async def list_resources(session, mode: Modes, page_size=SnapshotStore.LIST_PAGE_SIZE):
+    """
+    Gets the name and url of every resource of a resource type by following the paginated list endpoint.
+
+    :param session: PokemonSession
+    :param mode: Modes member of the resource type
+    :param page_size: Integer, number of results asked for per page
+    :return: list of dicts with name and url
+    """
+    results = []
+    next_url = f"{mode.value}?limit={page_size}&offset=0"
+    while next_url:
+        page = await session.get_json(next_url)
+        results.extend(page['results'])
+        next_url = page.get('next')
+    return results
+
+
+async def list_resource_urls(session, mode: Modes, page_size=SnapshotStore.LIST_PAGE_SIZE):
+    """
+    Gets the url of every resource of a resource type by following the paginated list endpoint.
+
+    :param session: PokemonSession
+    :param mode: Modes member of the resource type
+    :param page_size: Integer, number of results asked for per page
+    :return: list of strings
+    """
+    return [result['url'] for result in await list_resources(session, mode, page_size)]
+
+
+async def fetch_resources(session, mode: Modes):
+    """
+    Gets every resource of a resource type through the session, skipping the ones that fail.
+
+    :param session: PokemonSession
+    :param mode: Modes member of the resource type
+    :return: list of json
+    """
+    urls = await list_resource_urls(session, mode)
+    responses = await asyncio.gather(*[session.get_json(url) for url in urls], return_exceptions=True)
+    fetched = []
+    for url, response_json in zip(urls, responses):
+        if isinstance(response_json, Exception):
+            print(f"Skipping {url}: {response_json}")
+            continue
+        fetched.append(response_json)
+    return fetched
+
+
+async def load_resources(session, snapshot_path, mode: Modes):
+    """
+    Gets every resource of a resource type from the snapshot if it has them, otherwise through the session.
+
+    :param session: PokemonSession
+    :param snapshot_path: String, filepath of the snapshot
+    :param mode: Modes member of the resource type
+    :return: list of json
+    """
+    kind = ResponseCache.resource_kind(f"{mode.value}/0")
+    if os.path.exists(snapshot_path):
+        from pokeretriever.pokemon_pkdx import open_store
+        store = session.snapshot or open_store(snapshot_path)
+        try:
+            if store.count(kind):
+                return list(store.iter_kind(kind))
+        finally:
+            if store is not session.snapshot:
+                store.close()
+    return await fetch_resources(session, mode)
+
+
+async def crawl_snapshot(session, store: SnapshotStore, modes=tuple(Modes)):
+    """
+    Crawls every resource of the given resource types into store.
+
+    :param session: PokemonSession used for the crawl
+    :param store: SnapshotStore to fill
+    :param modes: iterable of Modes members to crawl
+    :return: dict of resource type to number of resources stored
+    """
+    counts = {}
+    for mode in modes:
+        kind = ResponseCache.resource_kind(f"{mode.value}/0")
+        stored = 0
+        for response_json in await fetch_resources(session, mode):
+            store.put(kind, response_json)
+            stored += 1
+        store.commit()
+        counts[kind] = stored
+    return counts
@@ -0,0 +1,213 @@
+"""
+This module contains RunStats class that collects opt-in counters, latency histograms and Chrome trace events of a run,
+and NullStats class that stands in for it when instrumentation is off.
+"""
+import asyncio
+import contextlib
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+
+
+class Histogram:
+    """
+    Histogram represents latencies bucketed on a logarithmic scale, four buckets per doubling, so percentiles can be
+    estimated in constant memory however many observations there are.
+    """
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self._buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        milliseconds = max(seconds * 1000, 1e-3)
+        self._buckets[math.floor(math.log2(milliseconds) * self.BUCKETS_PER_DOUBLING)] += 1
+
+    def percentile(self, fraction):
+        """
+        Estimates a percentile from the upper bound of the bucket it falls in.
+
+        :param fraction: Float between 0 and 1
+        :return: Float, milliseconds
+        """
+        if not self.count:
+            return 0.0
+        threshold = fraction * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= threshold:
+                return min(2 ** ((bucket + 1) / self.BUCKETS_PER_DOUBLING), self.maximum * 1000)
+        return self.maximum * 1000
+
+
+class NullStats:
+    """
+    NullStats represents disabled instrumentation, every method does nothing.
+    """
+    enabled = False
+    _NULL_TIMER = contextlib.nullcontext()
+
+    def count(self, name, amount=1):
+        pass
+
+    def observe(self, name, seconds):
+        pass
+
+    def timer(self, name):
+        return self._NULL_TIMER
+
+    def make_trace_configs(self):
+        return []
+
+    def report(self, file=sys.stderr):
+        pass
+
+
+class RunStats(NullStats):
+    """
+    RunStats represents enabled instrumentation. It keeps counters and latency histograms per name, hooks aiohttp's
+    TraceConfig for DNS, connection and request timings and bytes received, and optionally records every timed
+    section as a Chrome trace event (open the file in chrome://tracing or Perfetto).
+    """
+    enabled = True
+
+    def __init__(self, trace_path=None):
+        self._counters = defaultdict(int)
+        self._histograms = defaultdict(Histogram)
+        self._trace_path = trace_path
+        self._events = []
+        self._lanes = {}
+        self._origin = time.perf_counter()
+
+    def count(self, name, amount=1):
+        """
+        Adds amount to the counter name.
+
+        :param name: String
+        :param amount: Integer
+        :return: None
+        """
+        self._counters[name] += amount
+
+    def observe(self, name, seconds, started=None):
+        """
+        Records a duration in the histogram name, and as a trace event if tracing and started is known.
+
+        :param name: String
+        :param seconds: Float
+        :param started: Float/None, perf_counter value the section started at
+        :return: None
+        """
+        self._histograms[name].observe(seconds)
+        if self._trace_path is not None and started is not None:
+            self._events.append({'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': self._lane(),
+                                 'ts': (started - self._origin) * 1e6, 'dur': seconds * 1e6})
+
+    def _lane(self):
+        """
+        Gets a small integer per asyncio task so that concurrent sections appear on separate trace rows.
+
+        :return: Integer
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return self._lanes.setdefault(id(task), len(self._lanes))
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """
+        Times the body of a with statement, including any awaits inside it.
+
+        :param name: String
+        :return: context manager
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, started)
+
+    def make_trace_configs(self):
+        """
+        Makes the aiohttp TraceConfig recording DNS, connection and request timings and bytes received.
+
+        :return: list of aiohttp.TraceConfig
+        """
+        import aiohttp
+
+        def start(phase):
+            async def on_start(session, context, params):
+                setattr(context, phase, time.perf_counter())
+            return on_start
+
+        def end(phase, name):
+            async def on_end(session, context, params):
+                started = getattr(context, phase, None)
+                if started is not None:
+                    self.observe(name, time.perf_counter() - started, started)
+            return on_end
+
+        async def on_chunk(session, context, params):
+            self.count('http.bytes_received', len(params.chunk))
+
+        async def on_reuse(session, context, params):
+            self.count('http.connection_reused')
+
+        async def on_exception(session, context, params):
+            self.count('http.exceptions')
+
+        async def on_request_end(session, context, params):
+            self.count(f'http.status.{params.response.status}')
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_dns_resolvehost_start.append(start('dns'))
+        trace_config.on_dns_resolvehost_end.append(end('dns', 'http.dns'))
+        trace_config.on_connection_create_start.append(start('connect'))
+        trace_config.on_connection_create_end.append(end('connect', 'http.connect'))
+        trace_config.on_request_start.append(start('request'))
+        trace_config.on_request_end.append(end('request', 'http.request'))
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_response_chunk_received.append(on_chunk)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        trace_config.on_request_exception.append(on_exception)
+        return [trace_config]
+
+    def _ratio(self, hits, misses):
+        total = self._counters.get(hits, 0) + self._counters.get(misses, 0)
+        return f"{self._counters.get(hits, 0) / total:.1%}" if total else "n/a"
+
+    def report(self, file=sys.stderr):
+        """
+        Writes the run summary to file and the Chrome trace to the trace path if there is one.
+
+        :param file: text stream
+        :return: None
+        """
+        print("Run statistics", file=file)
+        print(f"  elapsed: {time.perf_counter() - self._origin:.3f}s", file=file)
+        print(f"  response cache hit ratio: {self._ratio('cache.hit', 'cache.miss')}", file=file)
+        print(f"  object memo hit ratio: {self._ratio('memo.hit', 'memo.miss')}", file=file)
+        for name in sorted(self._counters):
+            print(f"  {name}: {self._counters[name]}", file=file)
+        print(f"  {'timer':<28}{'count':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>9}{'p99 ms':>9}", file=file)
+        for name in sorted(self._histograms):
+            histogram = self._histograms[name]
+            print(f"  {name:<28}{histogram.count:>8}{histogram.total:>10.3f}"
+                  f"{histogram.total / histogram.count * 1000:>10.2f}"
+                  f"{histogram.percentile(0.5):>9.2f}{histogram.percentile(0.99):>9.2f}", file=file)
+        if self._trace_path is not None:
+            with open(self._trace_path, mode='w', encoding='utf-8') as trace_file:
+                json.dump({'traceEvents': self._events, 'displayTimeUnit': 'ms'}, trace_file)
+            print(f"  trace written to {self._trace_path}", file=file)
@@ -0,0 +1,56 @@
+"""
+This module contains the worker side of sharded runs: every worker process keeps its own event loop and
+PokemonSession for the whole run and looks up the shards of the input it is handed.
+"""
+import asyncio
+from multiprocessing.util import Finalize
+from pokeretriever.pokemon_requests import SessionConfig, CacheConfig, SchedulerConfig
+from pokeretriever.pokemon_serializers import RenderedResult, to_record
+from pokeretriever.pokemon_session import PokemonSession
+
+_loop = None
+_session = None
+_name_indexes = {}
+
+
+def init_worker(session_config: SessionConfig, cache_config: CacheConfig, scheduler_config: SchedulerConfig):
+    """
+    Opens the event loop and PokemonSession of a worker process, closed again when the process exits.
+
+    :param session_config: SessionConfig
+    :param cache_config: CacheConfig, the on-disk cache is shared with the other workers
+    :param scheduler_config: SchedulerConfig, the share of the limits this worker gets
+    :return: None
+    """
+    global _loop, _session
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    _session = PokemonSession(session_config, cache_config, scheduler_config)
+    _loop.run_until_complete(_session.open())
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    _loop.run_until_complete(_session.close())
+    _loop.close()
+
+
+def run_shard(request, shard, queue_size):
+    """
+    Looks up a shard of the input and renders the results, so only text and records go back to the parent.
+
+    :param request: Request object
+    :param shard: list of (index in the input, query) tuples
+    :param queue_size: Integer, maximum number of requests in flight
+    :return: list of (index in the input, RenderedResult) tuples in the order they completed
+    """
+    return _loop.run_until_complete(_lookup_shard(request, shard, queue_size))
+
+
+async def _lookup_shard(request, shard, queue_size):
+    from pokeretriever.pokemon_facade import PokeFacade
+    results = []
+    pending = PokeFacade.execute_inputs(request, [query for _, query in shard], _session, queue_size, _name_indexes)
+    async for position, pokedex_object in pending:
+        results.append((shard[position][0], RenderedResult(str(pokedex_object), to_record(pokedex_object))))
+    return results
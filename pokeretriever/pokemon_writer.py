@@ -0,0 +1,136 @@
+"""
+This module contains OutputWriter class that streams PokedexObjects to the output file or the screen.
+"""
+import os
+import sys
+import time
+from pokeretriever.pokemon_formats import FORMAT_MAPPER
+from pokeretriever.pokemon_journal import Journal
+from pokeretriever.pokemon_requests import OutputConfig, FieldProjection
+from pokeretriever.pokemon_stats import NullStats
+
+
+class OutputWriter:
+    """
+    OutputWriter represents the single buffered handle results are written to as soon as they complete. In ordered
+    mode results that arrive early wait in a reorder buffer until every result before them has been written. The
+    handle is flushed every few records and every few seconds so partial results survive a crash. Records are laid
+    out by the OutputFormat chosen in the config. With a Journal every flush is synced to disk and then committed
+    to the journal, and inputs the journal has as completed are never waited for. The journal is removed once every
+    result has been written.
+    """
+
+    def __init__(self, output, num_of_requests, config: OutputConfig = None, search_mode='pokemon',
+                 stats: NullStats = None, projection: FieldProjection = None, journal: Journal = None):
+        self._output = output
+        self._num_of_requests = num_of_requests
+        self._config = config or OutputConfig()
+        self._format = FORMAT_MAPPER[self._config.format](search_mode, projection)
+        self._stats = stats or NullStats()
+        self._journal = journal
+        self._completed = journal.completed if journal else frozenset()
+        self._file = None
+        self._pending = {}
+        self._next_index = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(exc_type is None)
+
+    def open(self):
+        """
+        Opens the output file, writing the header if it is new or empty, or uses the screen if there is no output.
+
+        :return: None
+        """
+        if not self._output:
+            self._file = sys.stdout
+            if self._format.HEADER_ON_SCREEN:
+                self._format.write_header(self._file, self._num_of_requests)
+            return
+        if self._journal:
+            self._journal.truncate_output()
+        self._file = open(self._output, mode="a", encoding='utf-8', newline='', buffering=self._config.buffer_size)
+        if self._file.tell() == 0:
+            self._format.write_header(self._file, self._num_of_requests)
+        if self._journal:
+            self.flush()
+
+    def write(self, index, pokedex_object):
+        """
+        Writes pokedex_object, or holds on to it until every result before index is written in ordered mode.
+
+        :param index: Integer, position of the request in the input
+        :param pokedex_object: PokedexObject class object
+        :return: None
+        """
+        if not self._config.ordered:
+            self._write_record(index, pokedex_object)
+            return
+        self._pending[index] = pokedex_object
+        while True:
+            if self._next_index in self._pending:
+                self._write_record(self._next_index, self._pending.pop(self._next_index))
+            elif self._next_index not in self._completed:
+                break
+            self._next_index += 1
+
+    def _write_record(self, index, pokedex_object):
+        """
+        Writes a single record and flushes if enough records or time have gone by since the last flush.
+
+        :param index: Integer, position of the request in the input
+        :param pokedex_object: PokedexObject class object
+        :return: None
+        """
+        with self._stats.timer("write"):
+            self._format.write(self._file, pokedex_object)
+        if self._journal:
+            self._journal.add(index)
+        self._unflushed += 1
+        if self._unflushed >= self._config.flush_every or \
+                time.monotonic() - self._last_flush >= self._config.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Flushes the written records to the operating system, or with a journal syncs them to disk and commits them.
+
+        :return: None
+        """
+        with self._stats.timer("flush"):
+            if self._journal:
+                self._format.drain(self._file)
+            self._file.flush()
+            if self._journal:
+                os.fsync(self._file.fileno())
+                self._journal.commit(self._file.tell())
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self, finished=True):
+        """
+        Writes whatever is left in the reorder buffer and the format and closes the output file.
+
+        :param finished: Boolean, whether every result was written, the journal is only kept for --resume if not
+        :return: None
+        """
+        if self._file is None:
+            return
+        for index in sorted(self._pending):
+            self._write_record(index, self._pending.pop(index))
+        self._format.close(self._file)
+        self.flush()
+        if self._journal and finished:
+            self._journal.remove()
+        elif self._journal:
+            self._journal.close()
+        if self._file is not sys.stdout:
+            self._file.close()
+            print("Printed, shipped, and finished!")
+        self._file = None
@@ -0,0 +1,23 @@
+"""
+Fixtures shared by the tests: a small Pokedex of Pokemon and moves stored as a SQLite snapshot.
+"""
+import pytest
+from pokeretriever.pokemon_snapshot import SnapshotStore
+
+POKEMON = tuple({'id': pokemon_id, 'name': name, 'height': 7, 'weight': 69, 'stats': [], 'types': [],
+                 'abilities': [], 'moves': []}
+                for pokemon_id, name in ((1, 'bulbasaur'), (4, 'charmander'), (7, 'squirtle')))
+MOVES = tuple({'id': move_id, 'name': name, 'power': power, 'pp': 35, 'accuracy': 100}
+              for move_id, name, power in ((1, 'pound', 40), (33, 'tackle', 40), (52, 'ember', 40)))
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / 'snapshot.sqlite3')
+    store = SnapshotStore(path)
+    for pokemon in POKEMON:
+        store.put('pokemon', pokemon)
+    for move in MOVES:
+        store.put('move', move)
+    store.close()
+    return path
@@ -0,0 +1,63 @@
+"""
+Tests of resuming an interrupted run from the journal kept next to its output.
+"""
+import json
+import os
+import pytest
+from pokeretriever.pokemon_journal import Journal
+from pokeretriever.pokemon_requests import OutputConfig
+from pokeretriever.pokemon_serializers import RenderedResult
+from pokeretriever.pokemon_writer import OutputWriter
+
+NUM_OF_REQUESTS = 10
+CONFIG = OutputConfig(format='jsonl', ordered=True, flush_every=3, journal=True)
+
+
+def result(index):
+    return RenderedResult(f"result {index}", {'kind': 'pokemon', 'index': index})
+
+
+def run(output, indexes, journal):
+    """
+    Writes the results of indexes the way driver.py does.
+
+    :return: None
+    """
+    with OutputWriter(output, NUM_OF_REQUESTS, CONFIG, journal=journal) as writer:
+        for index in indexes:
+            if index not in journal.completed:
+                writer.write(index, result(index))
+
+
+def test_resume_after_crash_writes_every_record_once(tmp_path):
+    output = str(tmp_path / 'results.jsonl')
+    with pytest.raises(KeyboardInterrupt):
+        with OutputWriter(output, NUM_OF_REQUESTS, CONFIG, journal=Journal(output)) as writer:
+            for index in range(6):
+                writer.write(index, result(index))
+            raise KeyboardInterrupt
+    assert os.path.exists(output + Journal.SUFFIX)
+
+    # the crash tore a record of the output after the last commit and the last line of the journal
+    with open(output, mode='a', encoding='utf-8') as file:
+        file.write('{"kind": "pokemon", "ind')
+    with open(output + Journal.SUFFIX, mode='ab') as file:
+        file.write(b'999 6 7')
+
+    journal = Journal(output, resume=True)
+    assert journal.completed == set(range(6))
+    run(output, range(NUM_OF_REQUESTS), journal)
+
+    with open(output, encoding='utf-8') as file:
+        indexes = [json.loads(line)['index'] for line in file]
+    assert indexes == list(range(NUM_OF_REQUESTS))
+    assert not os.path.exists(output + Journal.SUFFIX)
+
+
+def test_clean_run_removes_the_journal(tmp_path):
+    output = str(tmp_path / 'results.jsonl')
+    run(output, range(NUM_OF_REQUESTS), Journal(output))
+
+    with open(output, encoding='utf-8') as file:
+        assert len(file.readlines()) == NUM_OF_REQUESTS
+    assert not os.path.exists(output + Journal.SUFFIX)
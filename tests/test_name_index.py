@@ -0,0 +1,28 @@
+"""
+Regression tests for validating queries against a NameIndex that is loaded lazily on the first input of a mode.
+"""
+import asyncio
+from pokeretriever.pokemon_facade import PokeFacade
+from pokeretriever.pokemon_index import InvalidQueryException
+from pokeretriever.pokemon_parser import FailedRequest
+from pokeretriever.pokemon_requests import Request, SessionConfig
+from pokeretriever.pokemon_session import PokemonSession
+
+
+async def lookup(snapshot_path, queries):
+    session = PokemonSession(SessionConfig(snapshot_path=snapshot_path, offline=True))
+    await session.open()
+    try:
+        request = Request('pokemon', None, None, False, None)
+        return {index: result async for index, result in PokeFacade.execute_inputs(request, queries, session)}
+    finally:
+        await session.close()
+
+
+def test_typo_is_rejected_after_lazy_index_load(snapshot_path):
+    results = asyncio.run(lookup(snapshot_path, ['charmandr', 'bulbasaur']))
+
+    assert isinstance(results[0], FailedRequest)
+    assert isinstance(results[0].error, InvalidQueryException)
+    assert 'charmander' in str(results[0].error)
+    assert not isinstance(results[1], FailedRequest)
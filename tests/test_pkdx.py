@@ -0,0 +1,53 @@
+"""
+Round-trip tests of the .pkdx format: a SnapshotStore written to .pkdx must read back the same through PkdxStore.
+"""
+import pytest
+from pokeretriever.pokemon_pkdx import PkdxStore, open_store
+from pokeretriever.pokemon_requests import API_ROOT
+from pokeretriever.pokemon_snapshot import SnapshotStore
+
+KINDS = ('pokemon', 'move')
+
+
+@pytest.fixture
+def stores(snapshot_path, tmp_path):
+    pkdx_path = str(tmp_path / 'snapshot.pkdx')
+    sqlite_store = SnapshotStore(snapshot_path)
+    counts = PkdxStore.write(sqlite_store, pkdx_path, KINDS)
+    pkdx_store = open_store(pkdx_path)
+    yield sqlite_store, pkdx_store, counts
+    pkdx_store.close()
+    sqlite_store.close()
+
+
+def test_write_reports_the_counts(stores):
+    sqlite_store, pkdx_store, counts = stores
+    assert isinstance(pkdx_store, PkdxStore)
+    assert counts == {kind: sqlite_store.count(kind) for kind in KINDS}
+    for kind in KINDS:
+        assert pkdx_store.count(kind) == sqlite_store.count(kind) > 0
+
+
+@pytest.mark.parametrize('kind', KINDS)
+def test_bodies_match_by_id_and_name(stores, kind):
+    sqlite_store, pkdx_store, _ = stores
+    for resource_id, name in sqlite_store.iter_names(kind):
+        for key in (resource_id, name, name.upper() + '/'):
+            url = f"{API_ROOT}/{kind}/{key}"
+            assert pkdx_store.get(url) == sqlite_store.get(url)
+            assert pkdx_store.get(url) is not None
+
+
+def test_names_and_bodies_iterate_in_id_order(stores):
+    sqlite_store, pkdx_store, _ = stores
+    for kind in KINDS:
+        assert list(pkdx_store.iter_names(kind)) == sorted(sqlite_store.iter_names(kind))
+        assert list(pkdx_store.iter_kind(kind)) == sorted(sqlite_store.iter_kind(kind), key=lambda body: body['id'])
+
+
+@pytest.mark.parametrize('url', [f"{API_ROOT}/pokemon/mew", f"{API_ROOT}/pokemon/151", f"{API_ROOT}/pokemon/2",
+                                 f"{API_ROOT}/move/zzz", f"{API_ROOT}/ability/1"])
+def test_misses_return_none(stores, url):
+    sqlite_store, pkdx_store, _ = stores
+    assert pkdx_store.get(url) is None
+    assert sqlite_store.get(url) is None
@@ -0,0 +1,64 @@
+"""
+Startup tests: short driver.py runs under python -X importtime must never import aiohttp.
+"""
+import os
+import subprocess
+import sys
+import pytest
+from pokeretriever.pokemon_cache import ResponseCache
+from pokeretriever.pokemon_json import dump_bytes
+from pokeretriever.pokemon_requests import API_ROOT
+
+DRIVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'driver.py')
+UNREACHABLE_API = 'http://127.0.0.1:9/api/v2'
+BULBASAUR = {'id': 1, 'name': 'bulbasaur', 'height': 7, 'weight': 69, 'stats': [], 'types': [], 'abilities': [],
+             'moves': []}
+
+
+def imported_modules(arguments):
+    """
+    Runs driver.py under -X importtime.
+
+    :param arguments: tuple of command-line arguments
+    :return: tuple (stdout, set of imported module names)
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', DRIVER, *arguments], capture_output=True,
+                             text=True, timeout=60)
+    modules = {line.split('|')[-1].strip() for line in process.stderr.splitlines()
+               if line.startswith('import time:') and 'self [us]' not in line}
+    return process.stdout, modules
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    path = str(tmp_path / 'cache')
+    cache = ResponseCache(path, 1024 * 1024, {})
+    cache.put(f"{API_ROOT}/pokemon/bulbasaur", dump_bytes(BULBASAUR))
+    cache.close()
+    return path
+
+
+def test_help_does_not_import_aiohttp():
+    stdout, modules = imported_modules(('--help',))
+    assert 'usage' in stdout
+    assert 'aiohttp' not in modules
+
+
+def test_invalid_mode_does_not_import_aiohttp():
+    stdout, modules = imported_modules(('bogus', '--inputdata', '1'))
+    assert 'Mode must be' in stdout
+    assert 'aiohttp' not in modules
+
+
+def test_cache_hit_does_not_import_aiohttp(cache_dir):
+    stdout, modules = imported_modules(('pokemon', '--inputdata', 'bulbasaur', '--no-daemon', '--no-index',
+                                        '--cache-dir', cache_dir, '--base-url', UNREACHABLE_API))
+    assert 'Pokemon: bulbasaur' in stdout
+    assert 'aiohttp' not in modules
+
+
+def test_offline_lookup_does_not_import_aiohttp(snapshot_path):
+    stdout, modules = imported_modules(('pokemon', '--inputdata', 'charmander', '--no-daemon', '--offline',
+                                        '--snapshot', snapshot_path))
+    assert 'Pokemon: charmander' in stdout
+    assert 'aiohttp' not in modules